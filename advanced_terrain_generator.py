@@ -4,32 +4,112 @@ Advanced Terrain Generator with AI Integration
 Supports local AI models like Ollama for enhanced terrain generation
 """
 
+import logging
 import os
 import json
-import requests
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from src.mesh_generator import MeshGenerator
 from utils.terrain_utils import TerrainUtils
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _rasterize_kernel(x_coords, y_coords, z_coords, x_min, x_max, y_min, y_max, resolution, n_tiles):
+        """Scatter vertex heights into per-tile grids in parallel and reduce them into (sums, counts)."""
+        n = x_coords.shape[0]
+        n_cells = resolution * resolution
+        tile_size = (n + n_tiles - 1) // n_tiles
+        x_scale = (resolution - 1) / (x_max - x_min + 1e-8)
+        y_scale = (resolution - 1) / (y_max - y_min + 1e-8)
+        
+        # Each tile accumulates into its own grid to avoid write contention
+        tile_sums = np.zeros((n_tiles, n_cells), dtype=np.float32)
+        tile_counts = np.zeros((n_tiles, n_cells), dtype=np.float32)
+        for t in prange(n_tiles):
+            for i in range(t * tile_size, min(n, (t + 1) * tile_size)):
+                ix = min(max(int((x_coords[i] - x_min) * x_scale + 0.5), 0), resolution - 1)
+                iy = min(max(int((y_coords[i] - y_min) * y_scale + 0.5), 0), resolution - 1)
+                cell = iy * resolution + ix
+                tile_sums[t, cell] += z_coords[i]
+                tile_counts[t, cell] += 1.0
+        
+        return tile_sums.sum(axis=0), tile_counts.sum(axis=0)
+else:
+    _rasterize_kernel = None
+
 class AdvancedTerrainGenerator:
     def __init__(self, use_ai=False, ai_endpoint="http://localhost:11434"):
         self.mesh_generator = MeshGenerator()
         self.terrain_utils = TerrainUtils()
         self.use_ai = use_ai
         self.ai_endpoint = ai_endpoint
+        self.ai_model = "llama3.2"  # or any available model
+        
+        # On-disk memo of previously enhanced descriptions, created on the first write
+        self._cache_dir = os.path.expanduser("~/.cache/advanced_terrain/ai_prompts")
+        
+        # HTTP session for the AI endpoint, created on first use
+        self._session = None
         
+        # Output directories already created by this generator
+        self._dirs_created = set()
+        
+        # Cached result of the last availability probe
+        self._ai_ok = None
+        self._ai_ok_ts = 0.0
+        
+    def _get_session(self):
+        """Return the pooled HTTP session, importing requests on first use."""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            # Reuse keep-alive connections to the AI endpoint across calls
+            self._session = requests.Session()
+            adapter = HTTPAdapter(max_retries=Retry(total=0), pool_connections=8, pool_maxsize=8)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+        return self._session
+    
     def check_ai_availability(self):
         """Check if local AI model (Ollama) is available."""
         if not self.use_ai:
             return False
-            
+        
+        # Reuse a recent probe result instead of hitting the endpoint again
+        if self._ai_ok is not None and time.monotonic() - self._ai_ok_ts < 60:
+            return self._ai_ok
+        
+        import requests
+        
         try:
-            response = requests.get(f"{self.ai_endpoint}/api/tags", timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+            response = self._get_session().get(f"{self.ai_endpoint}/api/tags", timeout=(1, 5))
+            self._ai_ok = response.status_code == 200
+        except requests.RequestException:
+            self._ai_ok = False
+        
+        self._ai_ok_ts = time.monotonic()
+        return self._ai_ok
     
     def enhance_description_with_ai(self, description):
         """Use local AI to enhance the terrain description."""
+        # Reuse a previous enhancement of the same description if cached
+        key = hashlib.sha256(f"{self.ai_model}|{description}".encode()).hexdigest()
+        cache_file = os.path.join(self._cache_dir, key + ".txt")
+        if os.path.exists(cache_file):
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                enhanced_description = f.read()
+            print(f"AI Enhanced Description (cached): {enhanced_description}")
+            return enhanced_description
+        
         if not self.check_ai_availability():
             return description
             
@@ -49,12 +129,13 @@ class AdvancedTerrainGenerator:
             """
             
             # Call Ollama API
-            response = requests.post(
+            response = self._get_session().post(
                 f"{self.ai_endpoint}/api/generate",
                 json={
-                    "model": "llama3.2",  # or any available model
+                    "model": self.ai_model,
                     "prompt": prompt,
-                    "stream": False
+                    "stream": False,
+                    "keep_alive": "5m"  # Keep the model loaded between calls
                 },
                 timeout=30
             )
@@ -63,6 +144,9 @@ class AdvancedTerrainGenerator:
                 result = response.json()
                 enhanced_description = result.get('response', description).strip()
                 print(f"AI Enhanced Description: {enhanced_description}")
+                os.makedirs(self._cache_dir, exist_ok=True)
+                with open(cache_file, 'w', encoding='utf-8') as f:
+                    f.write(enhanced_description)
                 return enhanced_description
             else:
                 print("AI enhancement failed, using original description")
@@ -72,104 +156,162 @@ class AdvancedTerrainGenerator:
             print(f"AI enhancement error: {e}")
             return description
     
-    def generate_terrain_with_ai(self, description, output_dir="output"):
+    def enhance_descriptions_with_ai(self, descriptions):
+        """Enhance several terrain descriptions concurrently over the shared session."""
+        if not self.check_ai_availability():
+            return list(descriptions)
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return list(executor.map(self.enhance_description_with_ai, descriptions))
+    
+    def generate_terrain_with_ai(self, description, output_dir="output", enhanced_description=None,
+                                 save_heightmap=True):
         """Generate terrain with optional AI enhancement."""
         print(f"Original Description: {description}")
         
-        # Enhance description with AI if available
-        if self.use_ai:
-            enhanced_description = self.enhance_description_with_ai(description)
-        else:
-            enhanced_description = description
+        # Enhance description with AI if available (unless enhanced up-front)
+        if enhanced_description is None:
+            if self.use_ai:
+                enhanced_description = self.enhance_description_with_ai(description)
+            else:
+                enhanced_description = description
         
         # Generate mesh
         mesh, confidence = self.mesh_generator.generate_mesh(enhanced_description)
+        output_file = self._save_terrain(mesh, output_dir, save_heightmap)
         
-        # Create output directory
-        os.makedirs(output_dir, exist_ok=True)
+        return mesh, confidence, output_file
+    
+    def _save_terrain(self, mesh, output_dir, save_heightmap=True):
+        """Write a generated terrain mesh and its extra outputs, returning the mesh path."""
+        # Create output directory (once per directory)
+        if output_dir not in self._dirs_created:
+            os.makedirs(output_dir, exist_ok=True)
+            self._dirs_created.add(output_dir)
         
         # Save mesh
         output_file = os.path.join(output_dir, "advanced_terrain.obj")
         self.mesh_generator.save_mesh(mesh, output_file)
         
         # Generate additional outputs
-        self._generate_additional_outputs(mesh, output_dir)
+        if save_heightmap:
+            self._generate_additional_outputs(mesh, output_dir)
         
-        return mesh, confidence, output_file
+        return output_file
     
     def _generate_additional_outputs(self, mesh, output_dir):
         """Generate additional outputs like heightmaps and textures."""
         try:
+            # Imaging libraries are only needed here, so import them lazily
+            from matplotlib import cm
+            from PIL import Image
+            
             # Extract heightmap from mesh if possible
             vertices = mesh.vertices
             if len(vertices) > 0:
-                # Create a simple heightmap visualization
-                x_coords = vertices[:, 0]
-                y_coords = vertices[:, 1]
-                z_coords = vertices[:, 2]
+                # Create a simple heightmap visualization (float32 is plenty for an image)
+                x_coords = np.ascontiguousarray(vertices[:, 0], dtype=np.float32)
+                y_coords = np.ascontiguousarray(vertices[:, 1], dtype=np.float32)
+                z_coords = np.ascontiguousarray(vertices[:, 2], dtype=np.float32)
                 
-                # Create a 2D heightmap
-                import numpy as np
-                from matplotlib import pyplot as plt
-                
-                # Create a grid for heightmap
-                x_min, x_max = x_coords.min(), x_coords.max()
-                y_min, y_max = y_coords.min(), y_coords.max()
+                # Create a grid for heightmap (both axes bounded in one strided pass each)
+                x_min, y_min = vertices[:, :2].min(axis=0)
+                x_max, y_max = vertices[:, :2].max(axis=0)
                 
                 # Generate heightmap
                 resolution = 100
-                x_grid = np.linspace(x_min, x_max, resolution)
-                y_grid = np.linspace(y_min, y_max, resolution)
-                X, Y = np.meshgrid(x_grid, y_grid)
-                
-                # Interpolate Z values
-                from scipy.interpolate import griddata
-                Z = griddata((x_coords, y_coords), z_coords, (X, Y), method='linear')
+                Z = self._rasterize_heightmap(x_coords, y_coords, z_coords,
+                                              x_min, x_max, y_min, y_max, resolution)
                 
                 # Save heightmap
                 heightmap_file = os.path.join(output_dir, "heightmap.png")
-                plt.figure(figsize=(10, 8))
-                plt.imshow(Z, cmap='terrain', extent=[x_min, x_max, y_min, y_max])
-                plt.colorbar(label='Height')
-                plt.title('Terrain Heightmap')
-                plt.savefig(heightmap_file, dpi=150, bbox_inches='tight')
-                plt.close()
+                Z_normalized = (Z - Z.min()) / (Z.max() - Z.min() + np.float32(1e-9))
+                rgba = cm.terrain(Z_normalized, bytes=True)
+                Image.fromarray(rgba).save(heightmap_file, compress_level=1)
                 
                 print(f"Heightmap saved to: {heightmap_file}")
                 
         except Exception as e:
             print(f"Could not generate additional outputs: {e}")
     
-    def batch_generate(self, descriptions, output_dir="output"):
-        """Generate multiple terrains from a list of descriptions."""
-        results = []
+    def _rasterize_heightmap(self, x_coords, y_coords, z_coords, x_min, x_max, y_min, y_max, resolution):
+        """Bucket-average vertex heights onto a regular grid, filling empty cells from the nearest sample."""
+        from scipy import ndimage
         
-        for i, description in enumerate(descriptions):
-            print(f"\nGenerating terrain {i+1}/{len(descriptions)}")
-            print(f"Description: {description}")
+        if _rasterize_kernel is not None:
+            # JIT-compiled parallel scatter (Numba available)
+            sums, counts = _rasterize_kernel(
+                x_coords, y_coords, z_coords,
+                float(x_min), float(x_max), float(y_min), float(y_max),
+                resolution, max(1, min(os.cpu_count() or 1, len(x_coords)))
+            )
+        else:
+            # Map each vertex to its nearest grid cell
+            ix = np.rint((x_coords - x_min) / (x_max - x_min + 1e-8) * (resolution - 1)).astype(np.intp)
+            iy = np.rint((y_coords - y_min) / (y_max - y_min + 1e-8) * (resolution - 1)).astype(np.intp)
+            cells = np.clip(iy, 0, resolution - 1) * resolution + np.clip(ix, 0, resolution - 1)
             
-            try:
-                mesh, confidence, output_file = self.generate_terrain_with_ai(
-                    description, 
-                    os.path.join(output_dir, f"batch_{i+1}")
-                )
+            # Sum the heights and vertex counts that fall into each cell
+            sums = np.bincount(cells, weights=z_coords, minlength=resolution * resolution).astype(np.float32)
+            counts = np.bincount(cells, minlength=resolution * resolution).astype(np.float32)
+        
+        # Average the heights per cell
+        Z = (sums / np.maximum(counts, 1)).reshape(resolution, resolution)
+        
+        # Fill empty cells with the value of the nearest populated cell
+        empty = (counts == 0).reshape(resolution, resolution)
+        if empty.any():
+            indices = ndimage.distance_transform_edt(empty, return_distances=False, return_indices=True)
+            Z = Z[tuple(indices)]
+        
+        return Z
+    
+    def batch_generate(self, descriptions, output_dir="output", max_workers=4):
+        """Generate multiple terrains from a list of descriptions.
+        
+        Mesh generation runs one item at a time in this process, which owns the
+        models; each item's file writes and heightmap run on a thread pool while
+        the next item generates.
+        """
+        total = len(descriptions)
+        results = [None] * total
+        
+        if self.use_ai:
+            # Enhance all descriptions up-front while the AI model is warm
+            enhanced_descriptions = self.enhance_descriptions_with_ai(descriptions)
+        else:
+            enhanced_descriptions = list(descriptions)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = []
+            for i, description in enumerate(descriptions):
+                print(f"\nGenerating terrain {i+1}/{total}")
+                print(f"Description: {description}")
+                
+                try:
+                    mesh, confidence = self.mesh_generator.generate_mesh(enhanced_descriptions[i])
+                    future = executor.submit(self._save_terrain, mesh, os.path.join(output_dir, f"batch_{i+1}"))
+                    pending.append((i, description, mesh, confidence, future))
+                except Exception as e:
+                    print(f"✗ Error generating terrain {i+1}: {e}")
+                    results[i] = {'description': description, 'error': str(e)}
+            
+            for i, description, mesh, confidence, future in pending:
+                try:
+                    output_file = future.result()
+                except Exception as e:
+                    print(f"✗ Error generating terrain {i+1}: {e}")
+                    results[i] = {'description': description, 'error': str(e)}
+                    continue
                 
-                results.append({
+                print(f"✓ Successfully generated: {output_file}")
+                results[i] = {
                     'description': description,
                     'confidence': confidence,
                     'output_file': output_file,
                     'vertices': len(mesh.vertices),
                     'faces': len(mesh.faces)
-                })
-                
-                print(f"✓ Successfully generated: {output_file}")
-                
-            except Exception as e:
-                print(f"✗ Error generating terrain {i+1}: {e}")
-                results.append({
-                    'description': description,
-                    'error': str(e)
-                })
+                }
         
         return results
 
@@ -227,4 +369,6 @@ def main():
     print(f"Mesh stats: {len(mesh.vertices)} vertices, {len(mesh.faces)} faces")
 
 if __name__ == "__main__":
+    # MeshGenerator reports progress through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     main() 
\ No newline at end of file
@@ -5,8 +5,10 @@ This script demonstrates how the system can intelligently analyze and color
 generated 3D meshes based on semantic segmentation.
 """
 
+import logging
 import os
 import time
+import numpy as np
 from src.mesh_generator import MeshGenerator
 
 def main():
@@ -70,6 +72,16 @@ def main():
     
     results_summary = []
     
+    # Numeric summary columns, filled row by row for vectorized reductions
+    summary_dtype = np.dtype([
+        ('time', 'f4'), ('confidence', 'f4'), ('vertices', 'i4'),
+        ('faces', 'i4'), ('semantic_regions', 'i2')
+    ])
+    summary = np.empty(len(demo_examples), dtype=summary_dtype)
+    
+    # Ensure output directory exists
+    os.makedirs('output/demo_colored', exist_ok=True)
+    
     for i, example in enumerate(demo_examples, 1):
         print(f"🌍 {i}/{len(demo_examples)}: {example['name']}")
         print(f"   Description: {example['description']}")
@@ -90,9 +102,6 @@ def main():
             safe_name = example['name'].lower().replace(' ', '_')
             filename = f"output/demo_colored/{safe_name}.obj"
             
-            # Ensure output directory exists
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
-            
             # Save with coloring information
             print("   💾 Saving colored mesh and analysis...")
             generator.save_mesh(
@@ -122,6 +131,10 @@ def main():
                 'physics_type': physics_type
             }
             
+            summary[len(results_summary)] = (
+                generation_time, confidence, result_info['vertices'],
+                result_info['faces'], semantic_regions
+            )
             results_summary.append(result_info)
             
             print(f"   ✅ Success! Generated in {generation_time:.1f}s")
@@ -155,10 +168,11 @@ def main():
         print("📈 GENERATION SUMMARY REPORT")
         print("=" * 50)
         
-        total_time = sum(r['generation_time'] for r in results_summary)
-        avg_confidence = sum(r['confidence'] for r in results_summary) / len(results_summary)
-        total_vertices = sum(r['vertices'] for r in results_summary)
-        total_faces = sum(r['faces'] for r in results_summary)
+        summary = summary[:len(results_summary)]
+        total_time = float(summary['time'].sum())
+        avg_confidence = float(summary['confidence'].mean())
+        total_vertices = int(summary['vertices'].sum(dtype=np.int64))
+        total_faces = int(summary['faces'].sum(dtype=np.int64))
         
         print(f"✅ Successfully generated: {len(results_summary)}/{len(demo_examples)} meshes")
         print(f"⏱️  Total generation time: {total_time:.1f}s (avg: {total_time/len(results_summary):.1f}s)")
@@ -179,7 +193,7 @@ def main():
             all_expected_features.update(r['expected_features'])
         
         print(f"🔍 Feature types detected: {len(all_detected_features)} ({', '.join(sorted(all_detected_features))})")
-        print(f"🎨 Average semantic regions per mesh: {sum(r['semantic_regions'] for r in results_summary) / len(results_summary):.1f}")
+        print(f"🎨 Average semantic regions per mesh: {summary['semantic_regions'].mean():.1f}")
         print()
         
         # Detailed results table
@@ -226,4 +240,6 @@ def main():
         print("Please check your environment and try again.")
 
 if __name__ == "__main__":
+    # MeshGenerator reports progress through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     main() 
\ No newline at end of file
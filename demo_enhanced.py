@@ -4,18 +4,65 @@ Enhanced Terrain Generator Demo
 Demonstrates the new terrain and environment generation capabilities
 """
 
+import logging
 import os
 import time
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from shap_e.rendering.mesh import TriMesh
 from src.mesh_generator import MeshGenerator
-from utils.terrain_utils import TerrainUtils
 
-def demo_basic_terrain():
+# Generated meshes are persisted here so repeated demo runs skip generation; entries
+# older than MESH_CACHE_MAX_AGE seconds are regenerated
+MESH_CACHE_DIR = os.path.expanduser("~/.cache/text_to_mesh")
+MESH_CACHE_MAX_AGE = 7 * 24 * 3600
+
+# In-process results by cache key, most recently used last
+_MESH_MEMO = OrderedDict()
+_MESH_MEMO_SIZE = 128
+
+def _mesh_cache_key(generator, description):
+    """Cache key covering the model and generation settings as well as the description."""
+    settings = f"text300M|{generator.min_karras_steps}|{generator.max_karras_steps}|{description}"
+    return hashlib.sha256(settings.encode()).hexdigest()
+
+def generate_mesh_cached(generator, description):
+    """Generate a mesh, reusing earlier results for the same description and settings.
+    
+    Hits and misses both return (Shap-E TriMesh, confidence); the vertex color
+    channels are stored with the mesh.
+    """
+    key = _mesh_cache_key(generator, description)
+    if key in _MESH_MEMO:
+        _MESH_MEMO.move_to_end(key)
+        return _MESH_MEMO[key]
+    
+    cache_file = os.path.join(MESH_CACHE_DIR, f"{key}.npz")
+    if os.path.exists(cache_file) and time.time() - os.path.getmtime(cache_file) < MESH_CACHE_MAX_AGE:
+        with np.load(cache_file) as cached:
+            vertex_channels = {name[2:]: cached[name] for name in cached.files if name.startswith('v_')}
+            mesh = TriMesh(verts=cached['verts'], faces=cached['faces'], vertex_channels=vertex_channels or None)
+            result = mesh, float(cached['confidence'])
+    else:
+        mesh, _, confidence, *_ = generator.generate_mesh(description)
+        arrays = {'verts': mesh.verts, 'faces': mesh.faces, 'confidence': confidence}
+        for name, channel in (mesh.vertex_channels or {}).items():
+            arrays[f'v_{name}'] = channel
+        os.makedirs(MESH_CACHE_DIR, exist_ok=True)
+        np.savez_compressed(cache_file, **arrays)
+        result = mesh, confidence
+    
+    _MESH_MEMO[key] = result
+    if len(_MESH_MEMO) > _MESH_MEMO_SIZE:
+        _MESH_MEMO.popitem(last=False)
+    return result
+
+def demo_basic_terrain(generator):
     """Demonstrate basic terrain generation."""
     print("🌄 Basic Terrain Generation Demo")
     print("=" * 50)
     
-    generator = MeshGenerator()
-    
     terrains = [
         ("Mountain Peak", "a tall mountain peak"),
         ("Rolling Hills", "rolling hills landscape"),
@@ -31,7 +78,7 @@ def demo_basic_terrain():
         print(f"Description: {description}")
         
         start_time = time.time()
-        mesh, confidence = generator.generate_mesh(description)
+        mesh, confidence = generate_mesh_cached(generator, description)
         generation_time = time.time() - start_time
         
         output_file = f'output/demo/{name.lower().replace(" ", "_")}.obj'
@@ -43,13 +90,11 @@ def demo_basic_terrain():
         print(f"  Faces: {len(mesh.faces):,}")
         print(f"  Saved to: {output_file}")
 
-def demo_environments():
+def demo_environments(generator):
     """Demonstrate environment generation."""
     print("\n🌲 Environment Generation Demo")
     print("=" * 50)
     
-    generator = MeshGenerator()
-    
     environments = [
         ("Forest", "dense forest with trees"),
         ("Desert", "desert with sand dunes"),
@@ -62,7 +107,7 @@ def demo_environments():
         print(f"Description: {description}")
         
         start_time = time.time()
-        mesh, confidence = generator.generate_mesh(description)
+        mesh, confidence = generate_mesh_cached(generator, description)
         generation_time = time.time() - start_time
         
         output_file = f'output/demo/{name.lower()}_environment.obj'
@@ -79,22 +124,44 @@ def demo_advanced_features():
     print("\n🔧 Advanced Features Demo")
     print("=" * 50)
     
+    # Deferred so the other demos don't pay for the terrain/imaging stack
+    from utils.terrain_utils import TerrainUtils
+    
     terrain_utils = TerrainUtils()
     
-    # Generate heightmap
+    # Generate heightmap and slope map tile by tile so each pass works on an
+    # L2-sized block; tiles carry a 1-cell halo that is cropped when stitching
+    # so the 3x3 Sobel neighbourhood sees no seams
     print("📊 Generating heightmap...")
-    heightmap = terrain_utils.generate_heightmap(
-        width=200, height=200, 
-        scale=50, octaves=6, 
-        terrain_type='mountain'
-    )
+    width, height, tile_size = 200, 200, 128
+    heightmap = np.empty((height, width), dtype=np.float32)
+    slope_map = np.empty_like(heightmap)
+    
+    for ty in range(0, height, tile_size):
+        for tx in range(0, width, tile_size):
+            # Halo-padded tile bounds, clipped to the terrain
+            y0, x0 = max(ty - 1, 0), max(tx - 1, 0)
+            y1, x1 = min(ty + tile_size + 1, height), min(tx + tile_size + 1, width)
+            tile = terrain_utils.generate_heightmap_tile(
+                x0, y0, x1 - x0, y1 - y0, width, height,
+                scale=50, octaves=6, base=0,
+                terrain_type='mountain', dtype=np.float32
+            )
+            
+            # Interior of the padded tile that this block owns
+            inner = (slice(ty - y0, ty - y0 + min(tile_size, height - ty)),
+                     slice(tx - x0, tx - x0 + min(tile_size, width - tx)))
+            block = (slice(ty, ty + tile_size), slice(tx, tx + tile_size))
+            heightmap[block] = tile[inner]
+            slope_map[block] = terrain_utils.generate_slope_map(tile)[inner]
     
     # Save heightmap visualization
     heightmap_file = 'output/demo/heightmap.png'
     terrain_utils.save_heightmap_as_image(heightmap, heightmap_file)
     print(f"✓ Heightmap saved to: {heightmap_file}")
     
-    # Apply erosion
+    # Apply erosion to the whole stitched heightmap: droplets move material between
+    # neighbouring cells, so eroding tiles separately would leave seams
     print("🌊 Applying erosion...")
     eroded_heightmap = terrain_utils.apply_erosion(heightmap, iterations=50)
     
@@ -103,20 +170,17 @@ def demo_advanced_features():
     terrain_utils.save_heightmap_as_image(eroded_heightmap, eroded_file)
     print(f"✓ Eroded heightmap saved to: {eroded_file}")
     
-    # Generate slope map
+    # Save slope map
     print("📐 Generating slope map...")
-    slope_map = terrain_utils.generate_slope_map(heightmap)
     slope_file = 'output/demo/slope_map.png'
     terrain_utils.save_heightmap_as_image(slope_map, slope_file, colormap='viridis')
     print(f"✓ Slope map saved to: {slope_file}")
 
-def demo_parameter_extraction():
+def demo_parameter_extraction(generator):
     """Demonstrate parameter extraction from text."""
     print("\n📝 Parameter Extraction Demo")
     print("=" * 50)
     
-    generator = MeshGenerator()
-    
     test_descriptions = [
         "mountain 100 meters wide high resolution",
         "forest 50 meters tall",
@@ -139,13 +203,11 @@ def demo_parameter_extraction():
                 print(f"    {key}: {value}")
         print(f"  Is terrain: {result.get('is_terrain', False)}")
 
-def demo_performance_comparison():
+def demo_performance_comparison(generator):
     """Compare performance of different terrain types."""
     print("\n⚡ Performance Comparison Demo")
     print("=" * 50)
     
-    generator = MeshGenerator()
-    
     terrain_types = [
         ("Basic Mountain", "mountain"),
         ("Detailed Mountain", "mountain high resolution"),
@@ -160,7 +222,7 @@ def demo_performance_comparison():
         print(f"\n⏱️  Testing: {name}")
         
         start_time = time.time()
-        mesh, confidence = generator.generate_mesh(description)
+        mesh, confidence = generate_mesh_cached(generator, description)
         generation_time = time.time() - start_time
         
         results.append({
@@ -192,12 +254,15 @@ def main():
     # Create output directory
     os.makedirs('output/demo', exist_ok=True)
     
+    # Load the models once and share them across all demos
+    generator = MeshGenerator()
+    
     # Run demos
-    demo_basic_terrain()
-    demo_environments()
+    demo_basic_terrain(generator)
+    demo_environments(generator)
     demo_advanced_features()
-    demo_parameter_extraction()
-    demo_performance_comparison()
+    demo_parameter_extraction(generator)
+    demo_performance_comparison(generator)
     
     print(f"\n🎉 Demo completed!")
     print(f"Check the 'output/demo' directory for all generated files.")
@@ -215,4 +280,6 @@ def main():
         print(f"  📁 {file} ({size_str})")
 
 if __name__ == "__main__":
+    # MeshGenerator reports progress through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     main() 
\ No newline at end of file
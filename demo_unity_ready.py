@@ -5,10 +5,59 @@ This script demonstrates the complete pipeline for generating Unity-ready 3D mes
 with colors, collision, materials, and physics.
 """
 
-from src.mesh_generator import MeshGenerator
+import logging
+from src.mesh_generator import get_generator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
 import os
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _save_one(generator, example, mesh, collision_mesh, confidence, material_type, physics_type):
+    """Save one generated demo example, returning its file info and status lines."""
+    try:
+        # Create filename
+        safe_name = example['name'].lower().replace(' ', '_')
+        filename = f"output/demo/{safe_name}.obj"
+        path = Path(filename)
+        collision_path = path.with_name(path.stem + '_collision.obj')
+        prefab_path = path.with_name(path.stem + '_prefab.json')
+        
+        # Save with Unity optimization
+        generator.save_mesh(mesh, collision_mesh, filename, material_type, physics_type, parallel=True)
+        
+        # Collect file information
+        file_info = {
+            'name': example['name'],
+            'visual_mesh': filename,
+            'collision_mesh': str(collision_path),
+            'prefab_data': str(prefab_path),
+            'visual_name': path.name,
+            'collision_name': collision_path.name,
+            'prefab_name': prefab_path.name,
+            'material_type': material_type,
+            'physics_type': physics_type,
+            'vertices': len(mesh.vertices),
+            'collision_vertices': len(collision_mesh.vertices),
+            'confidence': confidence
+        }
+        
+        return file_info, [
+            f"   ✅ Generated successfully!",
+            f"   📊 Stats: {len(mesh.vertices)} vertices, {len(collision_mesh.vertices)} collision vertices",
+            f"   🎨 Material: {material_type}",
+            f"   ⚡ Physics: {physics_type}",
+            f"   📁 Files: {path.name}",
+            ""
+        ]
+        
+    except Exception as e:
+        return None, [f"   ❌ Failed: {str(e)}", ""]
+
 def demo_unity_ready_generation():
     """Demonstrate Unity-ready mesh generation with various examples."""
     
@@ -18,9 +67,6 @@ def demo_unity_ready_generation():
     print("including colors, collision, materials, and physics.")
     print()
     
-    # Initialize the mesh generator
-    generator = MeshGenerator()
-    
     # Create output directory
     os.makedirs('output/demo', exist_ok=True)
     
@@ -68,46 +114,30 @@ def demo_unity_ready_generation():
     
     generated_files = []
     
-    for i, example in enumerate(demo_examples, 1):
+    # Generate the examples one at a time with the models loaded in this process;
+    # each example's file writes run on a worker thread while the next one generates.
+    # Output is printed here in order
+    generator = get_generator()
+    with ThreadPoolExecutor(max_workers=min(len(demo_examples), 4)) as executor:
+        pending = []
+        for example in demo_examples:
+            try:
+                # Generate the mesh
+                mesh, collision_mesh, confidence, material_type, physics_type = generator.generate_mesh(example['description'])
+                pending.append(executor.submit(_save_one, generator, example, mesh, collision_mesh,
+                                               confidence, material_type, physics_type))
+            except Exception as e:
+                pending.append((None, [f"   ❌ Failed: {str(e)}", ""]))
+        results = [item.result() if isinstance(item, Future) else item for item in pending]
+    
+    for i, (example, (file_info, status_lines)) in enumerate(zip(demo_examples, results), 1):
         print(f"🌍 {i}. {example['name']}")
         print(f"   Description: {example['description']}")
+        for line in status_lines:
+            print(line)
         
-        try:
-            # Generate the mesh
-            mesh, collision_mesh, confidence, material_type, physics_type = generator.generate_mesh(example['description'])
-            
-            # Create filename
-            safe_name = example['name'].lower().replace(' ', '_')
-            filename = f"output/demo/{safe_name}.obj"
-            
-            # Save with Unity optimization
-            generator.save_mesh(mesh, collision_mesh, filename, material_type, physics_type)
-            
-            # Collect file information
-            file_info = {
-                'name': example['name'],
-                'visual_mesh': filename,
-                'collision_mesh': filename.replace('.obj', '_collision.obj'),
-                'prefab_data': filename.replace('.obj', '_prefab.json'),
-                'material_type': material_type,
-                'physics_type': physics_type,
-                'vertices': len(mesh.vertices),
-                'collision_vertices': len(collision_mesh.vertices),
-                'confidence': confidence
-            }
-            
+        if file_info is not None:
             generated_files.append(file_info)
-            
-            print(f"   ✅ Generated successfully!")
-            print(f"   📊 Stats: {len(mesh.vertices)} vertices, {len(collision_mesh.vertices)} collision vertices")
-            print(f"   🎨 Material: {material_type}")
-            print(f"   ⚡ Physics: {physics_type}")
-            print(f"   📁 Files: {os.path.basename(filename)}")
-            print()
-            
-        except Exception as e:
-            print(f"   ❌ Failed: {str(e)}")
-            print()
     
     # Generate Unity scene file
     generate_unity_scene_file(generated_files)
@@ -122,9 +152,9 @@ def demo_unity_ready_generation():
     print("📦 Generated Files:")
     for file_info in generated_files:
         print(f"   • {file_info['name']}:")
-        print(f"     - Visual: {os.path.basename(file_info['visual_mesh'])}")
-        print(f"     - Collision: {os.path.basename(file_info['collision_mesh'])}")
-        print(f"     - Prefab: {os.path.basename(file_info['prefab_data'])}")
+        print(f"     - Visual: {file_info['visual_name']}")
+        print(f"     - Collision: {file_info['collision_name']}")
+        print(f"     - Prefab: {file_info['prefab_name']}")
     
     print()
     print("🚀 Unity Import Instructions:")
@@ -151,8 +181,8 @@ def generate_unity_scene_file(generated_files):
     for file_info in generated_files:
         scene_data['objects'].append({
             'name': file_info['name'],
-            'mesh_file': os.path.basename(file_info['visual_mesh']),
-            'collision_file': os.path.basename(file_info['collision_mesh']),
+            'mesh_file': file_info['visual_name'],
+            'collision_file': file_info['collision_name'],
             'material': file_info['material_type'],
             'physics_material': file_info['physics_type'],
             'transform': {
@@ -169,8 +199,12 @@ def generate_unity_scene_file(generated_files):
     
     # Save scene file
     scene_file = 'output/demo/unity_scene.json'
-    with open(scene_file, 'w') as f:
-        json.dump(scene_data, f, indent=2)
+    if orjson is not None:
+        with open(scene_file, 'wb') as f:
+            f.write(orjson.dumps(scene_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(scene_file, 'w') as f:
+            json.dump(scene_data, f, indent=2)
     
     print(f"📄 Scene file generated: {scene_file}")
 
@@ -215,4 +249,6 @@ def main():
     print("Check the 'output/demo/' folder for your Unity-ready meshes.")
 
 if __name__ == "__main__":
+    # MeshGenerator reports progress through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     main() 
\ No newline at end of file
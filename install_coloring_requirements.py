@@ -6,12 +6,14 @@ Run this script to install all required packages for the intelligent mesh colori
 
 import subprocess
 import sys
-import importlib.util
+import importlib
 
-def check_package(package_name):
-    """Check if a package is already installed."""
-    spec = importlib.util.find_spec(package_name)
-    return spec is not None
+def probe(module_name):
+    """Import a module, returning it or None if it is not installed."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
 
 def install_package(package_name):
     """Install a package using pip."""
@@ -21,6 +23,12 @@ def install_package(package_name):
     except subprocess.CalledProcessError:
         return False
 
+def install_packages(package_names):
+    """Install several packages with a single pip invocation."""
+    cmd = [sys.executable, "-m", "pip", "install", "--disable-pip-version-check", "--no-input", *package_names]
+    result = subprocess.run(cmd, check=False)
+    return result.returncode == 0
+
 def main():
     print("🎨 Installing Mesh Analysis and Coloring System Dependencies")
     print("=" * 65)
@@ -55,8 +63,11 @@ def main():
     to_install = []
     already_installed = []
     
+    # Import each package once; results are reused for the final import test
+    probed = {import_name: probe(import_name) for import_name, _ in required_packages}
+    
     for import_name, package_name in required_packages:
-        if check_package(import_name):
+        if probed[import_name] is not None:
             already_installed.append(package_name)
             print(f"✅ {package_name} - already installed")
         else:
@@ -75,14 +86,22 @@ def main():
     success_count = 0
     failed_packages = []
     
-    for package in to_install:
-        print(f"\nInstalling {package}...")
-        if install_package(package):
+    # Resolve and install everything in one pip run
+    if install_packages(to_install):
+        for package in to_install:
             print(f"✅ Successfully installed {package}")
-            success_count += 1
-        else:
-            print(f"❌ Failed to install {package}")
-            failed_packages.append(package)
+        success_count = len(to_install)
+    else:
+        # Retry one by one to find out which packages failed
+        print("Batch installation failed, retrying packages individually...")
+        for package in to_install:
+            print(f"\nInstalling {package}...")
+            if install_package(package):
+                print(f"✅ Successfully installed {package}")
+                success_count += 1
+            else:
+                print(f"❌ Failed to install {package}")
+                failed_packages.append(package)
     
     print(f"\n📊 Installation Summary:")
     print(f"✅ Successfully installed: {success_count}/{len(to_install)} packages")
@@ -107,24 +126,21 @@ def main():
     
     # Test import of key modules
     print("\n🧪 Testing key imports...")
-    test_imports = [
-        ("numpy", "np"),
-        ("scipy", None),
-        ("sklearn", None),
-        ("networkx", "nx"),
-        ("matplotlib.pyplot", "plt"),
-    ]
+    test_imports = ["numpy", "scipy", "sklearn", "networkx", "matplotlib.pyplot"]
+    
+    # Pick up packages installed above
+    importlib.invalidate_caches()
     
     all_imports_successful = True
-    for module, alias in test_imports:
-        try:
-            if alias:
-                exec(f"import {module} as {alias}")
-            else:
-                exec(f"import {module}")
+    for module in test_imports:
+        # Only import modules that were not already imported successfully
+        if probed.get(module) is None:
+            probed[module] = probe(module)
+        
+        if probed[module] is not None:
             print(f"✅ {module} import successful")
-        except ImportError as e:
-            print(f"❌ {module} import failed: {e}")
+        else:
+            print(f"❌ {module} import failed")
             all_imports_successful = False
     
     if all_imports_successful:
@@ -1,5 +1,21 @@
+import logging
 import os
-from src.mesh_generator import MeshGenerator
+from pathlib import Path
+import torch
+from src.mesh_generator import get_generator
+
+def _derive_paths(filename):
+    """Derive the names of all files saved alongside a generated mesh."""
+    stem = Path(filename).stem
+    return {
+        'mesh': f"{stem}.obj",
+        'collision': f"{stem}_collision.obj",
+        'prefab': f"{stem}_prefab.json",
+        'color_info': f"{stem}_color_info.json",
+        'color_legend': f"{stem}_color_legend.png",
+        'analysis': f"{stem}_analysis.json",
+        'texture': f"{stem}_texture.png"
+    }
 
 def main():
     print("=== AI-Powered Text to 3D Mesh Generator with Intelligent Coloring ===")
@@ -17,28 +33,36 @@ def main():
     
     # Initialize the mesh generator
     print("Initializing AI models...")
-    generator = MeshGenerator()
+    generator = get_generator()
     print("Ready to generate!")
     
+    # Park the models on the CPU while waiting for input (set TEXT_TO_MESH_IDLE_UNLOAD=0 to disable)
+    idle_unload = torch.cuda.is_available() and os.environ.get('TEXT_TO_MESH_IDLE_UNLOAD', '1') == '1'
+    if idle_unload:
+        generator.to('cpu')
+        torch.cuda.empty_cache()
+    
+    # Show the example prompts once instead of on every turn
+    print("\nExample prompts:")
+    print("1. Complex landscape:")
+    print("   'Iceland summer landscape with foggy morning mood, aqua hot springs")
+    print("    and lupine flowers near highland mountains at sunrise'")
+    print("\n2. Detailed environment:")
+    print("   'Ancient forest clearing with moss-covered stones, morning mist")
+    print("    floating between old trees, and a small stream nearby'")
+    print("\n3. Mixed scene:")
+    print("   'Desert oasis with palm trees around a clear blue pool,")
+    print("    surrounded by golden sand dunes under the evening sky'")
+    print("\nTips:")
+    print("- Include environmental details (time of day, weather, mood)")
+    print("- Describe materials and textures")
+    print("- Mention colors and lighting")
+    print("- Combine multiple elements (water, vegetation, terrain)")
+    print("\nEnter your description at the prompt (or 'quit' to exit).")
+    
     while True:
         # Get user input
-        print("\nExample prompts:")
-        print("1. Complex landscape:")
-        print("   'Iceland summer landscape with foggy morning mood, aqua hot springs")
-        print("    and lupine flowers near highland mountains at sunrise'")
-        print("\n2. Detailed environment:")
-        print("   'Ancient forest clearing with moss-covered stones, morning mist")
-        print("    floating between old trees, and a small stream nearby'")
-        print("\n3. Mixed scene:")
-        print("   'Desert oasis with palm trees around a clear blue pool,")
-        print("    surrounded by golden sand dunes under the evening sky'")
-        print("\nTips:")
-        print("- Include environmental details (time of day, weather, mood)")
-        print("- Describe materials and textures")
-        print("- Mention colors and lighting")
-        print("- Combine multiple elements (water, vegetation, terrain)")
-        
-        text_description = input("\nEnter your description (or 'quit' to exit): ").strip()
+        text_description = input("\n> ").strip()
         
         if text_description.lower() in ['quit', 'exit', 'q']:
             print("Goodbye!")
@@ -49,6 +73,9 @@ def main():
             continue
         
         try:
+            if idle_unload:
+                generator.to('cuda')
+            
             # Generate the mesh with intelligent analysis and coloring
             print(f"\nGenerating: '{text_description}'")
             mesh, collision_mesh, confidence, material_type, physics_type, analysis_results, color_results = generator.generate_mesh(text_description)
@@ -70,16 +97,17 @@ def main():
             color_categories = list(color_results['color_info']['color_legend'].keys())
             print(f"Color categories applied: {', '.join(color_categories)}")
             
+            paths = _derive_paths(filename)
             print(f"\nFiles created in 'output/' directory:")
-            print(f"- Main mesh: {os.path.basename(filename)}")
-            print(f"- Collision mesh: {os.path.basename(filename).replace('.obj', '_collision.obj')}")
-            print(f"- Unity prefab: {os.path.basename(filename).replace('.obj', '_prefab.json')}")
-            print(f"- Color information: {os.path.basename(filename).replace('.obj', '_color_info.json')}")
-            print(f"- Color legend: {os.path.basename(filename).replace('.obj', '_color_legend.png')}")
-            print(f"- Mesh analysis: {os.path.basename(filename).replace('.obj', '_analysis.json')}")
+            print(f"- Main mesh: {paths['mesh']}")
+            print(f"- Collision mesh: {paths['collision']}")
+            print(f"- Unity prefab: {paths['prefab']}")
+            print(f"- Color information: {paths['color_info']}")
+            print(f"- Color legend: {paths['color_legend']}")
+            print(f"- Mesh analysis: {paths['analysis']}")
             
             if color_results.get('texture_map') is not None:
-                print(f"- Texture map: {os.path.basename(filename).replace('.obj', '_texture.png')}")
+                print(f"- Texture map: {paths['texture']}")
             
             print("\nReady to import into Unity with:")
             print("- Intelligent semantic vertex colors")
@@ -96,6 +124,13 @@ def main():
             print("2. Focus on the most important elements first")
             print("3. Make sure the AI models are properly loaded")
             print("4. Check if you have enough GPU memory available")
+        
+        finally:
+            if idle_unload:
+                generator.to('cpu')
+                torch.cuda.empty_cache()
 
 if __name__ == "__main__":
+    # MeshGenerator reports progress through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     main()
@@ -1,25 +1,80 @@
+import re
 import numpy as np
-import torch
-import trimesh
-from scipy.spatial.distance import cdist
-from scipy.cluster.hierarchy import dendrogram, linkage, fcluster
-from sklearn.cluster import DBSCAN, KMeans
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-import networkx as nx
+from concurrent.futures import ThreadPoolExecutor
+from scipy import sparse
+from scipy.spatial import cKDTree
 from typing import Dict, List, Tuple, Optional
 import warnings
 warnings.filterwarnings("ignore")
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _slopes_csr(vertices, indptr, indices):
+        """Mean absolute slope from each vertex to its CSR neighbors."""
+        n = vertices.shape[0]
+        slopes = np.zeros(n)
+        for i in prange(n):
+            start, end = indptr[i], indptr[i + 1]
+            if end - start < 2:
+                continue
+            total = 0.0
+            count = 0
+            for p in range(start, end):
+                j = indices[p]
+                dx = vertices[j, 0] - vertices[i, 0]
+                dy = vertices[j, 1] - vertices[i, 1]
+                horizontal = np.sqrt(dx * dx + dy * dy)
+                if horizontal > 1e-8:
+                    total += abs(vertices[j, 2] - vertices[i, 2]) / horizontal
+                    count += 1
+            if count > 0:
+                slopes[i] = total / count
+        return slopes
+else:
+    _slopes_csr = None
+
 class MeshAnalyzer:
     """
     Advanced mesh analysis and segmentation system for identifying semantic regions
     in generated 3D meshes based on geometric and topological features.
     """
     
+    # Keywords hinting at each semantic category in a text description
+    CATEGORY_KEYWORDS = {
+        'water': frozenset(['water', 'lake', 'river', 'stream', 'pond', 'spring', 'pool', 'blue']),
+        'vegetation': frozenset(['tree', 'forest', 'grass', 'flower', 'green', 'vegetation', 'bush', 'plant']),
+        'terrain': frozenset(['terrain', 'ground', 'earth', 'soil', 'dirt', 'brown']),
+        'rocks': frozenset(['rock', 'stone', 'cliff', 'boulder', 'gray', 'grey']),
+        'snow': frozenset(['snow', 'ice', 'frozen', 'white', 'winter'])
+    }
+    
+    # Keywords counted as distinct scene elements when estimating the cluster count
+    ELEMENT_KEYWORDS = {
+        'water': frozenset(['water', 'lake', 'river', 'stream', 'pond', 'spring']),
+        'vegetation': frozenset(['tree', 'forest', 'grass', 'flower', 'vegetation', 'bush']),
+        'terrain': frozenset(['mountain', 'hill', 'terrain', 'ground', 'landscape']),
+        'rocks': frozenset(['rock', 'stone', 'cliff', 'boulder']),
+        'snow': frozenset(['snow', 'ice', 'frozen'])
+    }
+    
+    # One precompiled alternation per keyword set, searched against the lowercased
+    # description; substring matches keep derived words ("rocky", "snowy", "waterfall")
+    CATEGORY_PATTERNS = {category: re.compile('|'.join(map(re.escape, sorted(keywords))))
+                         for category, keywords in CATEGORY_KEYWORDS.items()}
+    ELEMENT_PATTERNS = {category: re.compile('|'.join(map(re.escape, sorted(keywords))))
+                        for category, keywords in ELEMENT_KEYWORDS.items()}
+    
     def __init__(self, device='cpu'):
         self.device = device
         
+        # Per-call state of the mesh currently being analyzed (vertices, faces, adjacency, tree)
+        self._ctx = None
+        
         # Predefined semantic categories with their geometric characteristics
         self.semantic_categories = {
             'water': {
@@ -67,24 +122,38 @@ class MeshAnalyzer:
         """
         print("\n🔍 Starting mesh analysis...")
         
-        # Extract geometric features
-        geometric_features = self._extract_geometric_features(mesh)
-        
-        # Extract topological features
-        topological_features = self._extract_topological_features(mesh)
-        
-        # Combine features for clustering
-        combined_features = self._combine_features(geometric_features, topological_features)
-        
-        # Perform semantic segmentation
-        segmentation_results = self._perform_segmentation(
-            mesh, combined_features, text_description
-        )
+        # Build contiguous buffers and spatial structures once for every helper in this analysis
+        vertices = mesh.verts if hasattr(mesh, 'verts') else mesh.vertices
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        faces = np.ascontiguousarray(mesh.faces, dtype=np.int32)
+        self._ctx = {
+            'vertices': vertices,
+            'faces': faces,
+            'adjacency': self._build_vertex_adjacency_csr(faces, len(vertices)),
+            'tree': cKDTree(vertices)
+        }
         
-        # Refine segmentation using post-processing
-        refined_segmentation = self._refine_segmentation(
-            mesh, segmentation_results, combined_features
-        )
+        try:
+            # Extract geometric features
+            geometric_features = self._extract_geometric_features(mesh)
+            
+            # Extract topological features
+            topological_features = self._extract_topological_features(mesh)
+            
+            # Combine features for clustering
+            combined_features = self._combine_features(geometric_features, topological_features)
+            
+            # Perform semantic segmentation
+            segmentation_results = self._perform_segmentation(
+                mesh, combined_features, text_description
+            )
+            
+            # Refine segmentation using post-processing
+            refined_segmentation = self._refine_segmentation(
+                mesh, segmentation_results, combined_features
+            )
+        finally:
+            self._ctx = None
         
         print(f"✅ Analysis complete! Found {len(np.unique(refined_segmentation['labels']))} semantic regions")
         
@@ -100,8 +169,7 @@ class MeshAnalyzer:
         """Extract geometric features from mesh vertices."""
         print("  📐 Extracting geometric features...")
         
-        vertices = mesh.verts if hasattr(mesh, 'verts') else mesh.vertices
-        faces = mesh.faces
+        vertices, faces = self._mesh_arrays(mesh)
         
         # Height-based features
         z_coords = vertices[:, 2]
@@ -110,12 +178,16 @@ class MeshAnalyzer:
         # Local curvature estimation
         curvature = self._estimate_curvature(vertices, faces)
         
+        # One nearest-neighbor query serves both roughness (k=8) and density (k=10)
+        tree = self._ctx['tree'] if self._ctx is not None else cKDTree(vertices)
+        knn = tree.query(vertices, k=min(10, len(vertices) - 1) + 1, workers=-1)
+        
         # Surface normal variation (roughness)
         normals = self._compute_vertex_normals(vertices, faces)
-        roughness = self._compute_roughness(vertices, normals, k=8)
+        roughness = self._compute_roughness(vertices, normals, k=8, knn=knn)
         
         # Local density (vertex clustering)
-        density = self._compute_local_density(vertices, k=10)
+        density = self._compute_local_density(vertices, k=10, knn=knn)
         
         # Slope analysis
         slopes = self._compute_slopes(vertices, faces)
@@ -139,14 +211,13 @@ class MeshAnalyzer:
         """Extract topological features from mesh connectivity."""
         print("  🕸️  Extracting topological features...")
         
-        vertices = mesh.verts if hasattr(mesh, 'verts') else mesh.vertices
-        faces = mesh.faces
+        vertices, faces = self._mesh_arrays(mesh)
         
-        # Build adjacency graph
-        adjacency_graph = self._build_adjacency_graph(vertices, faces)
+        # Vertex adjacency matrix
+        adjacency = self._get_adjacency(faces, len(vertices))
         
         # Compute connectivity features
-        connectivity_features = self._compute_connectivity_features(adjacency_graph)
+        connectivity_features = self._compute_connectivity_features(adjacency)
         
         # Compute geodesic distances to boundary
         boundary_distances = self._compute_boundary_distances(vertices, faces)
@@ -154,8 +225,7 @@ class MeshAnalyzer:
         return {
             'vertex_degree': connectivity_features['degrees'],
             'clustering_coefficient': connectivity_features['clustering'],
-            'boundary_distance': boundary_distances,
-            'connectivity_graph': adjacency_graph
+            'boundary_distance': boundary_distances
         }
     
     def _combine_features(self, geometric_features: Dict, topological_features: Dict) -> np.ndarray:
@@ -171,58 +241,79 @@ class MeshAnalyzer:
         
         # Add topological features
         for key, values in topological_features.items():
-            if key != 'connectivity_graph' and len(values.shape) == 1:
+            if len(values.shape) == 1:
                 feature_list.append(values.reshape(-1, 1))
         
         # Combine and normalize
-        combined = np.hstack(feature_list)
+        combined = np.hstack(feature_list).astype(np.float64)
         
-        # Standardize features
-        scaler = StandardScaler()
-        combined_normalized = scaler.fit_transform(combined)
+        # Standardize features in place (constant columns are left centered)
+        mean = combined.mean(axis=0)
+        std = combined.std(axis=0)
+        std[std == 0] = 1.0
+        combined -= mean
+        combined /= std
         
-        return combined_normalized
+        # Single precision is plenty for clustering and halves the bytes moved
+        return combined.astype(np.float32)
     
     def _perform_segmentation(self, mesh, features: np.ndarray, text_description: str) -> Dict:
         """Perform multi-scale segmentation using various clustering methods."""
         print("  🎯 Performing semantic segmentation...")
         
-        vertices = mesh.verts if hasattr(mesh, 'verts') else mesh.vertices
+        vertices, faces = self._mesh_arrays(mesh)
         
         # Determine number of expected clusters based on text description
         expected_clusters = self._estimate_cluster_count(text_description)
         
-        # Multi-scale clustering
-        results = {}
+        from sklearn.cluster import DBSCAN, KMeans, MiniBatchKMeans
         
-        # 1. K-means clustering
-        kmeans = KMeans(n_clusters=expected_clusters, random_state=42, n_init=10)
-        kmeans_labels = kmeans.fit_predict(features)
-        results['kmeans'] = kmeans_labels
+        # 1. K-means clustering (mini-batches for large meshes)
+        if len(features) > 10000:
+            kmeans = MiniBatchKMeans(n_clusters=expected_clusters, random_state=42,
+                                     batch_size=2048, n_init=3)
+        else:
+            kmeans = KMeans(n_clusters=expected_clusters, random_state=42, n_init=10, algorithm='elkan')
         
         # 2. DBSCAN for density-based clustering
         eps = self._estimate_eps(features)
         dbscan = DBSCAN(eps=eps, min_samples=max(5, len(vertices) // 100))
-        dbscan_labels = dbscan.fit_predict(features)
-        results['dbscan'] = dbscan_labels
-        
-        # 3. Hierarchical clustering
-        if len(vertices) < 5000:  # Only for smaller meshes due to computational cost
-            linkage_matrix = linkage(features, method='ward')
-            hierarchical_labels = fcluster(linkage_matrix, expected_clusters, criterion='maxclust')
-            results['hierarchical'] = hierarchical_labels
         
-        # 4. Height-based segmentation (for terrain-specific features)
-        height_labels = self._height_based_segmentation(vertices, expected_clusters)
-        results['height_based'] = height_labels
+        # Multi-scale clustering: the methods are independent and release the GIL
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                'kmeans': executor.submit(kmeans.fit_predict, features),
+                'dbscan': executor.submit(dbscan.fit_predict, features),
+                # 3. Hierarchical clustering on a bounded subsample, propagated to all vertices
+                'hierarchical': executor.submit(self._subsampled_ward_labels, features, expected_clusters),
+                # 4. Height-based segmentation (for terrain-specific features)
+                'height_based': executor.submit(self._height_based_segmentation, vertices, expected_clusters),
+            }
+            results = {method: future.result() for method, future in futures.items()}
         
         return results
     
+    def _subsampled_ward_labels(self, features: np.ndarray, n_clusters: int,
+                                max_samples: int = 1024) -> np.ndarray:
+        """Ward-link a random subsample and assign every vertex to its nearest cluster centroid."""
+        from scipy.cluster.hierarchy import linkage, fcluster
+        
+        n_samples = len(features)
+        sample_idx = np.random.default_rng(42).choice(n_samples, size=min(max_samples, n_samples), replace=False)
+        sample = features[sample_idx]
+        
+        sample_labels = fcluster(linkage(sample, method='ward'), n_clusters, criterion='maxclust')
+        cluster_ids = np.unique(sample_labels)
+        centroids = np.stack([sample[sample_labels == k].mean(axis=0) for k in cluster_ids])
+        
+        _, nearest = cKDTree(centroids).query(features, k=1)
+        return cluster_ids[nearest]
+    
     def _refine_segmentation(self, mesh, segmentation_results: Dict, features: np.ndarray) -> Dict:
         """Refine segmentation by combining different clustering results."""
         print("  ✨ Refining segmentation...")
         
-        vertices = mesh.verts if hasattr(mesh, 'verts') else mesh.vertices
+        vertices, faces = self._mesh_arrays(mesh)
         
         # Combine different segmentation results using ensemble method
         all_labels = []
@@ -243,7 +334,7 @@ class MeshAnalyzer:
             final_labels = self._ensemble_voting(all_labels, weights)
         
         # Post-process to ensure spatial coherence
-        final_labels = self._spatial_smoothing(vertices, mesh.faces, final_labels)
+        final_labels = self._spatial_smoothing(vertices, faces, final_labels)
         
         return {
             'labels': final_labels,
@@ -264,7 +355,8 @@ class MeshAnalyzer:
         semantic_hints = {}
         
         for category, properties in self.semantic_categories.items():
-            if any(keyword in text_lower for keyword in self._get_category_keywords(category)):
+            pattern = self.CATEGORY_PATTERNS.get(category)
+            if pattern is not None and pattern.search(text_lower):
                 semantic_hints[category] = properties
         
         # If no specific hints, use default categories
@@ -294,26 +386,30 @@ class MeshAnalyzer:
     
     # Helper methods
     def _estimate_curvature(self, vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
-        """Estimate mean curvature at each vertex."""
-        try:
-            mesh_obj = trimesh.Trimesh(vertices=vertices, faces=faces)
-            return mesh_obj.vertex_defects
-        except:
-            # Fallback: simple curvature estimation
-            curvature = np.zeros(len(vertices))
-            for i, vertex in enumerate(vertices):
-                # Find neighboring vertices
-                neighbors = self._find_vertex_neighbors(i, faces)
-                if len(neighbors) > 2:
-                    # Compute local variation
-                    neighbor_coords = vertices[neighbors]
-                    center = np.mean(neighbor_coords, axis=0)
-                    distances = np.linalg.norm(neighbor_coords - center, axis=1)
-                    curvature[i] = np.std(distances)
-            return curvature
+        """Estimate Gaussian curvature at each vertex as its angle defect."""
+        faces = np.asarray(faces)
+        triangles = np.asarray(vertices, dtype=np.float64)[faces]
+        
+        # Interior angle at each corner of every face
+        angles = np.empty((len(faces), 3))
+        for corner in range(3):
+            u = triangles[:, (corner + 1) % 3] - triangles[:, corner]
+            v = triangles[:, (corner + 2) % 3] - triangles[:, corner]
+            norms = np.linalg.norm(u, axis=1) * np.linalg.norm(v, axis=1)
+            cosines = np.einsum('ij,ij->i', u, v) / np.maximum(norms, 1e-12)
+            angles[:, corner] = np.arccos(np.clip(cosines, -1.0, 1.0))
+        
+        # Degenerate faces contribute no angle
+        angles[np.linalg.norm(np.cross(triangles[:, 1] - triangles[:, 0],
+                                       triangles[:, 2] - triangles[:, 0]), axis=1) < 1e-12] = 0.0
+        
+        angle_sums = np.bincount(faces.ravel(), weights=angles.ravel(), minlength=len(vertices))
+        return 2 * np.pi - angle_sums
     
     def _compute_vertex_normals(self, vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
         """Compute vertex normals."""
+        import trimesh
+        
         try:
             mesh_obj = trimesh.Trimesh(vertices=vertices, faces=faces)
             return mesh_obj.vertex_normals
@@ -335,85 +431,68 @@ class MeshAnalyzer:
                     normals[i] = np.array([0, 0, 1])
             return normals
     
-    def _compute_roughness(self, vertices: np.ndarray, normals: np.ndarray, k: int = 8) -> np.ndarray:
+    def _compute_roughness(self, vertices: np.ndarray, normals: np.ndarray, k: int = 8,
+                           knn: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
         """Compute local surface roughness."""
-        roughness = np.zeros(len(vertices))
-        
-        for i, vertex in enumerate(vertices):
-            # Find k nearest neighbors
-            distances = np.linalg.norm(vertices - vertex, axis=1)
-            neighbor_indices = np.argsort(distances)[1:k+1]  # Exclude self
-            
-            if len(neighbor_indices) > 0:
-                # Compute normal variation
-                neighbor_normals = normals[neighbor_indices]
-                current_normal = normals[i]
-                
-                # Calculate angular differences
-                dot_products = np.dot(neighbor_normals, current_normal)
-                dot_products = np.clip(dot_products, -1, 1)  # Numerical stability
-                angular_diffs = np.arccos(dot_products)
-                roughness[i] = np.mean(angular_diffs)
-        
-        return roughness
+        k = min(k, len(vertices) - 1)
+        if k < 1:
+            return np.zeros(len(vertices))
+        
+        # Find k nearest neighbors of every vertex in one batched query
+        _, neighbor_indices = knn if knn is not None else cKDTree(vertices).query(vertices, k=k + 1)
+        neighbor_indices = neighbor_indices[:, 1:k + 1]  # Exclude self
+        
+        # Calculate angular differences between each normal and its neighbors' normals
+        dot_products = np.einsum('ijk,ik->ij', normals[neighbor_indices], normals)
+        dot_products = np.clip(dot_products, -1, 1)  # Numerical stability
+        return np.arccos(dot_products).mean(axis=1)
     
-    def _compute_local_density(self, vertices: np.ndarray, k: int = 10) -> np.ndarray:
+    def _compute_local_density(self, vertices: np.ndarray, k: int = 10,
+                               knn: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
         """Compute local vertex density."""
-        density = np.zeros(len(vertices))
-        
-        for i, vertex in enumerate(vertices):
-            distances = np.linalg.norm(vertices - vertex, axis=1)
-            k_nearest_distances = np.sort(distances)[1:k+1]  # Exclude self
-            if len(k_nearest_distances) > 0:
-                density[i] = 1.0 / (np.mean(k_nearest_distances) + 1e-8)
+        k = min(k, len(vertices) - 1)
+        if k < 1:
+            return np.zeros(len(vertices))
         
-        return density
+        distances, _ = knn if knn is not None else cKDTree(vertices).query(vertices, k=k + 1)
+        k_nearest_distances = distances[:, 1:k + 1]  # Exclude self
+        return 1.0 / (k_nearest_distances.mean(axis=1) + 1e-8)
     
     def _compute_slopes(self, vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
         """Compute local slope at each vertex."""
-        slopes = np.zeros(len(vertices))
-        
-        for i in range(len(vertices)):
-            neighbors = self._find_vertex_neighbors(i, faces)
-            if len(neighbors) >= 2:
-                # Compute local gradient
-                neighbor_coords = vertices[neighbors]
-                current_coord = vertices[i]
-                
-                # Calculate height differences
-                height_diffs = neighbor_coords[:, 2] - current_coord[2]
-                horizontal_distances = np.linalg.norm(neighbor_coords[:, :2] - current_coord[:2], axis=1)
-                
-                # Avoid division by zero
-                valid_indices = horizontal_distances > 1e-8
-                if np.any(valid_indices):
-                    local_slopes = np.abs(height_diffs[valid_indices] / horizontal_distances[valid_indices])
-                    slopes[i] = np.mean(local_slopes)
-        
+        adjacency = self._get_adjacency(faces, len(vertices))
+        indptr, indices = adjacency.indptr, adjacency.indices
+        
+        if _slopes_csr is not None:
+            return _slopes_csr(np.ascontiguousarray(vertices, dtype=np.float64), indptr, indices)
+        
+        # Vectorized fallback over every (vertex, neighbor) edge of the CSR
+        degrees = np.diff(indptr)
+        rows = np.repeat(np.arange(len(vertices)), degrees)
+        height_diffs = vertices[indices, 2] - vertices[rows, 2]
+        horizontal_distances = np.linalg.norm(vertices[indices, :2] - vertices[rows, :2], axis=1)
+        
+        # Avoid division by zero
+        valid = horizontal_distances > 1e-8
+        local_slopes = np.zeros(len(rows))
+        np.divide(np.abs(height_diffs), horizontal_distances, out=local_slopes, where=valid)
+        
+        totals = np.bincount(rows, weights=local_slopes, minlength=len(vertices))
+        counts = np.bincount(rows, weights=valid, minlength=len(vertices))
+        slopes = np.divide(totals, counts, out=np.zeros(len(vertices)), where=counts > 0)
+        slopes[degrees < 2] = 0.0
         return slopes
     
-    def _build_adjacency_graph(self, vertices: np.ndarray, faces: np.ndarray) -> nx.Graph:
-        """Build adjacency graph from mesh faces."""
-        G = nx.Graph()
-        G.add_nodes_from(range(len(vertices)))
-        
-        for face in faces:
-            # Add edges between all vertex pairs in the face
-            for i in range(3):
-                for j in range(i+1, 3):
-                    G.add_edge(face[i], face[j])
-        
-        return G
-    
-    def _compute_connectivity_features(self, graph: nx.Graph) -> Dict[str, np.ndarray]:
+    def _compute_connectivity_features(self, adjacency: sparse.csr_matrix) -> Dict[str, np.ndarray]:
         """Compute graph-based connectivity features."""
-        n_vertices = len(graph.nodes())
-        
         # Vertex degrees
-        degrees = np.array([graph.degree(i) for i in range(n_vertices)])
+        degrees = np.diff(adjacency.indptr)
         
-        # Clustering coefficients
-        clustering = np.array([nx.clustering(graph, i) for i in range(n_vertices)])
+        # Clustering coefficients: triangles through i are (A * A^2)_i / 2
+        triangles = np.asarray(adjacency.multiply(adjacency @ adjacency).sum(axis=1)).ravel() / 2
+        possible_triangles = degrees * (degrees - 1) / 2
+        clustering = np.divide(triangles, possible_triangles,
+                               out=np.zeros(len(degrees)), where=degrees > 1)
         
         return {
             'degrees': degrees,
@@ -423,28 +502,17 @@ class MeshAnalyzer:
     def _compute_boundary_distances(self, vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
         """Compute distance to mesh boundary for each vertex."""
         # Find boundary vertices (vertices with degree < expected for interior vertices)
-        vertex_degrees = np.zeros(len(vertices))
-        for face in faces:
-            for vertex_id in face:
-                vertex_degrees[vertex_id] += 1
+        vertex_degrees = np.bincount(np.asarray(faces).ravel(), minlength=len(vertices))
         
         # Boundary vertices typically have lower degree
         mean_degree = np.mean(vertex_degrees)
-        boundary_vertices = np.where(vertex_degrees < mean_degree * 0.7)[0]
+        boundary_mask = vertex_degrees < mean_degree * 0.7
         
-        if len(boundary_vertices) == 0:
+        if not np.any(boundary_mask):
             return np.ones(len(vertices))  # All vertices are equally far from boundary
         
-        # Compute distances to nearest boundary vertex
-        boundary_coords = vertices[boundary_vertices]
-        distances = np.zeros(len(vertices))
-        
-        for i, vertex in enumerate(vertices):
-            if i in boundary_vertices:
-                distances[i] = 0.0
-            else:
-                vertex_distances = np.linalg.norm(boundary_coords - vertex, axis=1)
-                distances[i] = np.min(vertex_distances)
+        # Distance to nearest boundary vertex in one batched query
+        distances, _ = cKDTree(vertices[boundary_mask]).query(vertices, k=1)
         
         # Normalize
         max_distance = np.max(distances)
@@ -453,46 +521,54 @@ class MeshAnalyzer:
         
         return distances
     
-    def _find_vertex_neighbors(self, vertex_id: int, faces: np.ndarray) -> List[int]:
+    def _mesh_arrays(self, mesh) -> Tuple[np.ndarray, np.ndarray]:
+        """Vertices and faces of the mesh, from the analysis context when one is active."""
+        if self._ctx is not None:
+            return self._ctx['vertices'], self._ctx['faces']
+        vertices = mesh.verts if hasattr(mesh, 'verts') else mesh.vertices
+        return vertices, mesh.faces
+    
+    def _get_adjacency(self, faces: np.ndarray, n_vertices: int) -> sparse.csr_matrix:
+        """Vertex adjacency of the mesh being analyzed, built on demand outside analyze_mesh."""
+        if self._ctx is not None:
+            return self._ctx['adjacency']
+        return self._build_vertex_adjacency_csr(faces, n_vertices)
+    
+    def _build_vertex_adjacency_csr(self, faces: np.ndarray, n_vertices: int) -> sparse.csr_matrix:
+        """Build a binary vertex-vertex adjacency matrix from mesh faces."""
+        faces = np.asarray(faces)
+        rows = faces[:, [0, 0, 1, 1, 2, 2]].ravel()
+        cols = faces[:, [1, 2, 0, 2, 0, 1]].ravel()
+        adjacency = sparse.coo_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(n_vertices, n_vertices)
+        ).tocsr()
+        adjacency.sum_duplicates()
+        adjacency.data[:] = 1
+        return adjacency
+    
+    def _find_vertex_neighbors(self, vertex_id: int, faces: np.ndarray) -> np.ndarray:
         """Find neighboring vertices for a given vertex."""
-        neighbors = set()
-        for face in faces:
-            if vertex_id in face:
-                neighbors.update(face.tolist())
-        neighbors.discard(vertex_id)  # Remove the vertex itself
-        return list(neighbors)
+        adjacency = self._get_adjacency(faces, max(int(np.max(faces)), vertex_id) + 1)
+        return adjacency.indices[adjacency.indptr[vertex_id]:adjacency.indptr[vertex_id + 1]]
     
     def _estimate_cluster_count(self, text_description: str) -> int:
         """Estimate the expected number of clusters based on text description."""
         text_lower = text_description.lower()
         
         # Count semantic elements mentioned
-        element_count = 0
-        for category, keywords in {
-            'water': ['water', 'lake', 'river', 'stream', 'pond', 'spring'],
-            'vegetation': ['tree', 'forest', 'grass', 'flower', 'vegetation', 'bush'],
-            'terrain': ['mountain', 'hill', 'terrain', 'ground', 'landscape'],
-            'rocks': ['rock', 'stone', 'cliff', 'boulder'],
-            'snow': ['snow', 'ice', 'frozen']
-        }.items():
-            if any(keyword in text_lower for keyword in keywords):
-                element_count += 1
+        element_count = sum(1 for pattern in self.ELEMENT_PATTERNS.values() if pattern.search(text_lower))
         
         # Default to 3-5 clusters, adjust based on complexity
         return max(3, min(element_count + 2, 8))
     
     def _estimate_eps(self, features: np.ndarray) -> float:
         """Estimate eps parameter for DBSCAN."""
-        # Use k-distance graph method
-        from sklearn.neighbors import NearestNeighbors
-        
+        # Use k-distance graph method (the query point itself counts as the first neighbor)
         k = min(10, len(features) // 10)
-        neighbors = NearestNeighbors(n_neighbors=k)
-        neighbors.fit(features)
-        distances, _ = neighbors.kneighbors(features)
+        distances, _ = cKDTree(features).query(features, k=[k], workers=-1)
         
         # Use the k-th nearest neighbor distance
-        kth_distances = distances[:, k-1]
+        kth_distances = distances[:, 0]
         return np.percentile(kth_distances, 80)  # Use 80th percentile
     
     def _height_based_segmentation(self, vertices: np.ndarray, n_clusters: int) -> np.ndarray:
@@ -500,66 +576,66 @@ class MeshAnalyzer:
         z_coords = vertices[:, 2]
         z_normalized = (z_coords - z_coords.min()) / (z_coords.max() - z_coords.min() + 1e-8)
         
-        # Create height-based bins
-        bins = np.linspace(0, 1, n_clusters + 1)
-        labels = np.digitize(z_normalized, bins) - 1
-        labels = np.clip(labels, 0, n_clusters - 1)
+        # Create equal-population height bins so every band receives vertices
+        bins = np.quantile(z_normalized, np.linspace(0, 1, n_clusters + 1))
+        labels = np.digitize(z_normalized, bins[1:-1])
         
         return labels
     
     def _ensemble_voting(self, all_labels: List[np.ndarray], weights: List[float]) -> np.ndarray:
         """Combine multiple segmentation results using weighted voting."""
         n_vertices = len(all_labels[0])
-        final_labels = np.zeros(n_vertices, dtype=int)
-        
-        # For each vertex, find the most common label across methods
-        for i in range(n_vertices):
-            votes = {}
-            for labels, weight in zip(all_labels, weights):
-                label = labels[i]
-                votes[label] = votes.get(label, 0) + weight
-            
-            # Choose label with highest weighted vote
-            final_labels[i] = max(votes.keys(), key=votes.get)
+        
+        # Labels can be negative (DBSCAN noise), so shift them to column indices
+        offset = min(int(labels.min()) for labels in all_labels)
+        n_columns = max(int(labels.max()) for labels in all_labels) - offset + 1
+        
+        # Accumulate each method's weight into a (vertices, labels) vote matrix;
+        # every method contributes exactly one vote per row, so no index repeats
+        votes = np.zeros((n_vertices, n_columns), dtype=np.float32)
+        rows = np.arange(n_vertices)
+        for labels, weight in zip(all_labels, weights):
+            votes[rows, labels - offset] += weight
+        
+        # Choose label with highest weighted vote
+        final_labels = votes.argmax(axis=1) + offset
         
         # Relabel to ensure consecutive integers starting from 0
-        unique_labels = np.unique(final_labels)
-        label_mapping = {old: new for new, old in enumerate(unique_labels)}
-        final_labels = np.array([label_mapping[label] for label in final_labels])
+        _, final_labels = np.unique(final_labels, return_inverse=True)
         
         return final_labels
     
     def _spatial_smoothing(self, vertices: np.ndarray, faces: np.ndarray, labels: np.ndarray) -> np.ndarray:
         """Apply spatial smoothing to segmentation labels."""
+        adjacency = self._get_adjacency(faces, len(vertices))
+        
+        n_vertices = len(vertices)
+        degrees = np.diff(adjacency.indptr)
+        rows = np.arange(n_vertices)
         smoothed_labels = labels.copy()
         
         # Iterative smoothing
         for iteration in range(3):  # 3 iterations of smoothing
-            new_labels = smoothed_labels.copy()
+            # Histogram of neighbor labels for every vertex in one sparse product
+            one_hot = sparse.csr_matrix(
+                (np.ones(n_vertices, dtype=np.int32), (rows, smoothed_labels)),
+                shape=(n_vertices, smoothed_labels.max() + 1)
+            )
+            neighbor_counts = adjacency @ one_hot
             
-            for i in range(len(vertices)):
-                neighbors = self._find_vertex_neighbors(i, faces)
-                if neighbors:
-                    neighbor_labels = smoothed_labels[neighbors]
-                    # Use majority vote among neighbors
-                    unique_labels, counts = np.unique(neighbor_labels, return_counts=True)
-                    majority_label = unique_labels[np.argmax(counts)]
-                    
-                    # Only change if majority is different and significant
-                    if majority_label != smoothed_labels[i] and np.max(counts) > len(neighbors) * 0.6:
-                        new_labels[i] = majority_label
+            # Use majority vote among neighbors
+            majority_labels = np.asarray(neighbor_counts.argmax(axis=1)).ravel()
+            majority_counts = neighbor_counts.max(axis=1).toarray().ravel()
             
-            smoothed_labels = new_labels
+            # Only change if majority is different and significant
+            change = (majority_labels != smoothed_labels) & (majority_counts > degrees * 0.6)
+            if not change.any():
+                break  # Converged; further passes would be no-ops
+            smoothed_labels = np.where(change, majority_labels, smoothed_labels)
         
         return smoothed_labels
     
-    def _get_category_keywords(self, category: str) -> List[str]:
+    def _get_category_keywords(self, category: str) -> frozenset:
         """Get keywords associated with a semantic category."""
-        keyword_map = {
-            'water': ['water', 'lake', 'river', 'stream', 'pond', 'spring', 'pool', 'blue'],
-            'vegetation': ['tree', 'forest', 'grass', 'flower', 'green', 'vegetation', 'bush', 'plant'],
-            'terrain': ['terrain', 'ground', 'earth', 'soil', 'dirt', 'brown'],
-            'rocks': ['rock', 'stone', 'cliff', 'boulder', 'gray', 'grey'],
-            'snow': ['snow', 'ice', 'frozen', 'white', 'winter']
-        }
-        return keyword_map.get(category, []) 
\ No newline at end of file
+        return self.CATEGORY_KEYWORDS.get(category, frozenset())
+
@@ -1,19 +1,71 @@
+import re
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap
-import colorsys
 from typing import Dict, List, Tuple, Optional, Union
 import cv2
-from PIL import Image, ImageDraw, ImageFilter
+from scipy.spatial import cKDTree
 import warnings
 warnings.filterwarnings("ignore")
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _apply_effects_fused(colors, semantic_id, height, lighting, curvature_factor, roughness_factor,
+                             wetness, height_influence, wetness_influence, noise_strength):
+        """Apply every advanced color effect to each vertex in a single read and write."""
+        n = colors.shape[0]
+        out = np.empty_like(colors)
+        for i in prange(n):
+            r, g, b = colors[i, 0], colors[i, 1], colors[i, 2]
+            h = height[i]
+            sid = semantic_id[i]
+            
+            # 1. Height-based color variation (0=terrain, 1=vegetation, 2=rocks)
+            if sid == 0:
+                f = 1.0 + height_influence * h
+                r, g, b = r * f, g * f, b * f
+            elif sid == 1 and h > 0.7:
+                r, g, b = r * 0.7 + 0.6 * 0.3, g * 0.7 + 0.4 * 0.3, b * 0.7 + 0.2 * 0.3
+            elif sid == 1 and h < 0.3:
+                r, g, b = r * 0.8 + 0.1 * 0.2, g * 0.8 + 0.8 * 0.2, b * 0.8 + 0.2 * 0.2
+            elif sid == 2 and h > 0.8:
+                r, g, b = r * 0.8 + 0.8 * 0.2, g * 0.8 + 0.8 * 0.2, b * 0.8 + 0.8 * 0.2
+            
+            # 2-3. Lighting and curvature shading
+            f = lighting[i] * curvature_factor[i]
+            r, g, b = r * f, g * f, b * f
+            
+            # 4. Roughness desaturation toward the HSV value
+            v = max(r, g, b)
+            f = roughness_factor[i]
+            r, g, b = v - (v - r) * f, v - (v - g) * f, v - (v - b) * f
+            
+            # 5. Wetness near water: darken, then blend with a faint blue tint
+            w = wetness[i]
+            if w > 0.0:
+                f = (1.0 - wetness_influence * w * 0.3) * 0.7
+                r, g, b = r * f, g * f, b * f + 0.1 * w * 0.2 * 0.3
+            
+            # 6. Natural color noise, clipped to the valid range
+            out[i, 0] = min(max(r + np.random.normal(0.0, noise_strength), 0.0), 1.0)
+            out[i, 1] = min(max(g + np.random.normal(0.0, noise_strength), 0.0), 1.0)
+            out[i, 2] = min(max(b + np.random.normal(0.0, noise_strength), 0.0), 1.0)
+        return out
+else:
+    _apply_effects_fused = None
+
 class MeshColorizer:
     """
     Advanced mesh coloring system that applies colors to 3D meshes based on
     semantic segmentation results from MeshAnalyzer.
     """
     
+    # Integer ids for semantic categories used by array-based color effects
+    SEMANTIC_IDS = {'terrain': 0, 'vegetation': 1, 'rocks': 2, 'water': 3, 'snow': 4}
+    
     def __init__(self):
         # Predefined color palettes for different environment types
         self.environment_palettes = {
@@ -70,6 +122,40 @@ class MeshColorizer:
             'wetness_factor': 0.3,      # Wetness darkening near water
             'exposure_factor': 0.2      # Sun exposure lightening
         }
+        
+        # Colors are clipped to [0, 1] in the end; single precision halves the memory traffic
+        for palette in self.environment_palettes.values():
+            for category, color in palette.items():
+                palette[category] = color.astype(np.float32)
+        
+        # Keywords that identify each environment type in a description, as one
+        # precompiled alternation per type (checked in order, first match wins)
+        environment_keywords = {
+            'alpine': ['alpine', 'mountain', 'highland', 'peak', 'snow', 'glacier'],
+            'desert': ['desert', 'sand', 'dune', 'arid', 'dry', 'oasis'],
+            'forest': ['forest', 'woodland', 'tree', 'jungle', 'canopy'],
+            'tropical': ['tropical', 'palm', 'beach', 'island', 'turquoise'],
+            'tundra': ['tundra', 'arctic', 'frozen', 'polar', 'cold'],
+            'volcanic': ['volcanic', 'lava', 'crater', 'ash', 'basalt']
+        }
+        self._env_patterns = {
+            env_type: re.compile('|'.join(map(re.escape, keywords)))
+            for env_type, keywords in environment_keywords.items()
+        }
+        
+        # Sunlight from above and slightly to the side (unit vector)
+        light_direction = np.array([0.3, 0.3, 0.9])
+        self._light_dir = light_direction / np.linalg.norm(light_direction)
+        
+        # Separable 5-tap Gaussian (sigma 1.0) used to smooth texture maps
+        self._gauss_kernel = cv2.getGaussianKernel(5, 1.0, cv2.CV_32F)
+        
+        # Customized palettes keyed by (environment type, modifiers found in the text)
+        self._palette_cache = {}
+        
+        # Random generator and reusable buffer for color noise
+        self._rng = np.random.default_rng()
+        self._noise_buf = None
     
     def colorize_mesh(self, mesh, analysis_results: Dict, text_description: str = "", 
                      environment_type: str = "alpine", advanced_effects: bool = True) -> Dict:
@@ -96,6 +182,9 @@ class MeshColorizer:
         # Get vertices
         vertices = mesh.verts if hasattr(mesh, 'verts') else mesh.vertices
         
+        # Integer semantic id per vertex, shared by every array-based effect
+        semantic_id = self._semantic_ids(segmentation['labels'], semantic_mapping['cluster_to_semantic'])
+        
         # Determine environment type from text if not specified
         if environment_type == "auto":
             environment_type = self._detect_environment_type(text_description)
@@ -104,14 +193,12 @@ class MeshColorizer:
         color_palette = self._get_color_palette(environment_type, text_description)
         
         # Apply base colors based on segmentation
-        base_colors = self._apply_base_colors(
-            vertices, segmentation, semantic_mapping, color_palette
-        )
+        base_colors = self._apply_base_colors(vertices, semantic_id, color_palette)
         
         # Apply advanced color effects if enabled
         if advanced_effects:
             final_colors = self._apply_advanced_effects(
-                vertices, base_colors, geometric_features, segmentation, semantic_mapping
+                vertices, base_colors, geometric_features, semantic_id
             )
         else:
             final_colors = base_colors
@@ -140,17 +227,8 @@ class MeshColorizer:
         text_lower = text_description.lower()
         
         # Check for specific environment keywords
-        environment_keywords = {
-            'alpine': ['alpine', 'mountain', 'highland', 'peak', 'snow', 'glacier'],
-            'desert': ['desert', 'sand', 'dune', 'arid', 'dry', 'oasis'],
-            'forest': ['forest', 'woodland', 'tree', 'jungle', 'canopy'],
-            'tropical': ['tropical', 'palm', 'beach', 'island', 'turquoise'],
-            'tundra': ['tundra', 'arctic', 'frozen', 'polar', 'cold'],
-            'volcanic': ['volcanic', 'lava', 'crater', 'ash', 'basalt']
-        }
-        
-        for env_type, keywords in environment_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
+        for env_type, pattern in self._env_patterns.items():
+            if pattern.search(text_lower):
                 return env_type
         
         # Default to alpine if no specific type detected
@@ -158,10 +236,6 @@ class MeshColorizer:
     
     def _get_color_palette(self, environment_type: str, text_description: str) -> Dict[str, np.ndarray]:
         """Get color palette for the specified environment type."""
-        base_palette = self.environment_palettes.get(environment_type, self.environment_palettes['alpine'])
-        
-        # Customize palette based on text description
-        customized_palette = base_palette.copy()
         text_lower = text_description.lower()
         
         # Adjust colors based on specific mentions
@@ -176,71 +250,82 @@ class MeshColorizer:
             'misty': (0, 0, 0.05)    # Misty blue tint
         }
         
-        for modifier, adjustment in color_adjustments.items():
-            if modifier in text_lower:
-                for category, color in customized_palette.items():
-                    if isinstance(adjustment, tuple):
-                        # RGB adjustment
-                        customized_palette[category] = np.clip(color + np.array(adjustment), 0, 1)
-                    else:
-                        # Brightness adjustment
-                        hsv_color = colorsys.rgb_to_hsv(*color)
-                        new_v = np.clip(hsv_color[2] + adjustment, 0, 1)
-                        customized_palette[category] = np.array(colorsys.hsv_to_rgb(hsv_color[0], hsv_color[1], new_v))
-        
-        return customized_palette
+        # The palette only depends on which modifiers appear, so reuse earlier results
+        modifiers = tuple(modifier for modifier in color_adjustments if modifier in text_lower)
+        cache_key = (environment_type, modifiers)
+        if cache_key not in self._palette_cache:
+            base_palette = self.environment_palettes.get(environment_type, self.environment_palettes['alpine'])
+            
+            # Customize palette based on text description
+            categories = list(base_palette.keys())
+            palette_colors = np.array([base_palette[category] for category in categories], dtype=np.float32)
+            
+            for modifier in modifiers:
+                adjustment = color_adjustments[modifier]
+                if isinstance(adjustment, tuple):
+                    # RGB adjustment
+                    palette_colors = np.clip(palette_colors + np.array(adjustment, dtype=np.float32), 0, 1)
+                else:
+                    # Brightness adjustment
+                    palette_colors = self._shift_value(palette_colors, adjustment)
+            
+            # Cached colors are shared between calls, so guard them against in-place edits
+            palette_colors.setflags(write=False)
+            self._palette_cache[cache_key] = dict(zip(categories, palette_colors))
+        
+        return dict(self._palette_cache[cache_key])
     
-    def _apply_base_colors(self, vertices: np.ndarray, segmentation: Dict, 
-                          semantic_mapping: Dict, color_palette: Dict[str, np.ndarray]) -> np.ndarray:
+    def _apply_base_colors(self, vertices: np.ndarray, semantic_id: np.ndarray,
+                          color_palette: Dict[str, np.ndarray]) -> np.ndarray:
         """Apply base colors to vertices based on segmentation."""
         print("  🖌️  Applying base colors...")
         
-        labels = segmentation['labels']
-        cluster_to_semantic = semantic_mapping['cluster_to_semantic']
+        # (K, 3) palette array in SEMANTIC_IDS order; unknown types use the terrain color
+        palette_array = np.array([
+            color_palette.get(semantic_type, color_palette['terrain']) for semantic_type in self.SEMANTIC_IDS
+        ], dtype=np.float32)
+        palette_index = np.where(semantic_id < 0, self.SEMANTIC_IDS['terrain'], semantic_id)
         
-        # Initialize color array
-        vertex_colors = np.zeros((len(vertices), 3))
-        
-        # Apply colors based on cluster assignment
-        for vertex_idx, cluster_id in enumerate(labels):
-            semantic_category = cluster_to_semantic.get(cluster_id, 'terrain')
-            base_color = color_palette.get(semantic_category, color_palette['terrain'])
-            vertex_colors[vertex_idx] = base_color
+        # Apply colors based on semantic id in one gather
+        vertex_colors = palette_array[palette_index]
         
         return vertex_colors
     
     def _apply_advanced_effects(self, vertices: np.ndarray, base_colors: np.ndarray,
-                              geometric_features: Dict, segmentation: Dict, 
-                              semantic_mapping: Dict) -> np.ndarray:
+                              geometric_features: Dict, semantic_id: np.ndarray) -> np.ndarray:
         """Apply advanced color effects for realism."""
         print("  ✨ Applying advanced color effects...")
         
         enhanced_colors = base_colors.copy()
-        labels = segmentation['labels']
-        cluster_to_semantic = semantic_mapping['cluster_to_semantic']
         
         # Extract features
         height = geometric_features['height']
         normals = geometric_features['normals']
-        curvature = geometric_features['curvature']
-        roughness = geometric_features['roughness']
+        
+        # Normalize curvature and roughness once for every effect that uses them
+        curvature_normalized = self._normalize(geometric_features['curvature'])
+        roughness_normalized = self._normalize(geometric_features['roughness'])
+        
+        if _apply_effects_fused is not None:
+            return self._apply_fused_effects(
+                vertices, enhanced_colors, height, normals, curvature_normalized, roughness_normalized,
+                semantic_id
+            )
         
         # 1. Height-based color variation
-        enhanced_colors = self._apply_height_effects(enhanced_colors, height, labels, cluster_to_semantic)
+        enhanced_colors = self._apply_height_effects(enhanced_colors, height, semantic_id)
         
         # 2. Normal-based lighting effects
         enhanced_colors = self._apply_lighting_effects(enhanced_colors, normals)
         
         # 3. Curvature-based shading
-        enhanced_colors = self._apply_curvature_shading(enhanced_colors, curvature)
+        enhanced_colors = self._apply_curvature_shading(enhanced_colors, curvature_normalized)
         
         # 4. Roughness-based texture effects
-        enhanced_colors = self._apply_roughness_effects(enhanced_colors, roughness)
+        enhanced_colors = self._apply_roughness_effects(enhanced_colors, roughness_normalized)
         
         # 5. Proximity effects (wetness near water, etc.)
-        enhanced_colors = self._apply_proximity_effects(
-            vertices, enhanced_colors, labels, cluster_to_semantic
-        )
+        enhanced_colors = self._apply_proximity_effects(vertices, enhanced_colors, semantic_id)
         
         # 6. Add natural color noise
         enhanced_colors = self._add_color_noise(enhanced_colors)
@@ -250,127 +335,167 @@ class MeshColorizer:
         
         return enhanced_colors
     
-    def _apply_height_effects(self, colors: np.ndarray, height: np.ndarray, 
-                            labels: np.ndarray, cluster_to_semantic: Dict) -> np.ndarray:
-        """Apply height-based color variations."""
-        height_adjusted = colors.copy()
+    def _apply_fused_effects(self, vertices: np.ndarray, colors: np.ndarray, height: np.ndarray,
+                             normals: np.ndarray, curvature_normalized: np.ndarray,
+                             roughness_normalized: np.ndarray, semantic_id: np.ndarray) -> np.ndarray:
+        """Apply all advanced effects with the fused Numba kernel."""
+        # Per-vertex factors; the kernel combines them with the colors in one pass
+        lighting = self._lighting_intensity(normals, np.float32)
         
-        for i, (color, h, label) in enumerate(zip(colors, height, labels)):
-            semantic_type = cluster_to_semantic.get(label, 'terrain')
-            
-            # Different height effects for different semantic types
-            if semantic_type == 'terrain':
-                # Terrain gets lighter at higher elevations
-                brightness_factor = 1.0 + self.color_variation['height_influence'] * h
-                height_adjusted[i] *= brightness_factor
-            elif semantic_type == 'vegetation':
-                # Vegetation changes color with altitude
-                if h > 0.7:  # High altitude vegetation
-                    height_adjusted[i] = self._blend_colors(color, np.array([0.6, 0.4, 0.2]), 0.3)
-                elif h < 0.3:  # Low altitude vegetation (lusher)
-                    height_adjusted[i] = self._blend_colors(color, np.array([0.1, 0.8, 0.2]), 0.2)
-            elif semantic_type == 'rocks':
-                # Rocks get more weathered (lighter) at higher elevations
-                if h > 0.8:
-                    height_adjusted[i] = self._blend_colors(color, np.array([0.8, 0.8, 0.8]), 0.2)
-        
-        return height_adjusted
+        curvature_factor = 1.0 - self.color_variation['curvature_influence'] * curvature_normalized
+        roughness_factor = 1.0 - 0.1 * roughness_normalized
+        
+        wetness = self._compute_wetness(vertices, semantic_id == self.SEMANTIC_IDS['water'])
+        
+        return _apply_effects_fused(
+            np.ascontiguousarray(colors, dtype=np.float32), semantic_id,
+            np.ascontiguousarray(height, dtype=np.float32), lighting.astype(np.float32),
+            curvature_factor.astype(np.float32), roughness_factor.astype(np.float32), wetness,
+            self.color_variation['height_influence'], self.color_variation['wetness_factor'],
+            self.color_variation['base_noise']
+        )
+    
+    def _apply_height_effects(self, colors: np.ndarray, height: np.ndarray,
+                            semantic_id: np.ndarray) -> np.ndarray:
+        """Apply height-based color variations (modifies colors in place)."""
+        # Different height effects for different semantic types (each vertex takes at
+        # most one branch, so updating in place is safe)
+        
+        # Terrain gets lighter at higher elevations
+        terrain = semantic_id == self.SEMANTIC_IDS['terrain']
+        colors[terrain] *= (1.0 + self.color_variation['height_influence'] * height[terrain])[:, None]
+        
+        # Vegetation changes color with altitude: drier up high, lusher down low
+        vegetation = semantic_id == self.SEMANTIC_IDS['vegetation']
+        high_vegetation = vegetation & (height > 0.7)
+        low_vegetation = vegetation & (height < 0.3)
+        colors[high_vegetation] = colors[high_vegetation] * 0.7 + np.array([0.6, 0.4, 0.2]) * 0.3
+        colors[low_vegetation] = colors[low_vegetation] * 0.8 + np.array([0.1, 0.8, 0.2]) * 0.2
+        
+        # Rocks get more weathered (lighter) at higher elevations
+        high_rocks = (semantic_id == self.SEMANTIC_IDS['rocks']) & (height > 0.8)
+        colors[high_rocks] = colors[high_rocks] * 0.8 + np.array([0.8, 0.8, 0.8]) * 0.2
+        
+        return colors
     
     def _apply_lighting_effects(self, colors: np.ndarray, normals: np.ndarray) -> np.ndarray:
-        """Apply lighting effects based on surface normals."""
-        # Simulate sunlight from above and slightly to the side
-        light_direction = np.array([0.3, 0.3, 0.9])
-        light_direction = light_direction / np.linalg.norm(light_direction)
-        
-        # Calculate dot product for each vertex normal
-        lighting_intensity = np.dot(normals, light_direction)
-        lighting_intensity = np.clip(lighting_intensity, 0.4, 1.0)  # Ambient lighting minimum
+        """Apply lighting effects based on surface normals (modifies colors in place)."""
+        lighting_intensity = self._lighting_intensity(normals, colors.dtype)
         
         # Apply lighting
-        lit_colors = colors * lighting_intensity.reshape(-1, 1)
+        np.multiply(colors, lighting_intensity[:, None], out=colors)
         
-        return lit_colors
+        return colors
     
-    def _apply_curvature_shading(self, colors: np.ndarray, curvature: np.ndarray) -> np.ndarray:
-        """Apply shading based on surface curvature."""
-        # Normalize curvature
-        curvature_normalized = (curvature - curvature.min()) / (curvature.max() - curvature.min() + 1e-8)
-        
+    def _lighting_intensity(self, normals: np.ndarray, dtype) -> np.ndarray:
+        """Clamped Lambert term of every vertex normal against the light direction."""
+        # Contiguous normals in the color dtype avoid hidden copies and upcasts in the product
+        normals = np.ascontiguousarray(normals, dtype=dtype)
+        lighting_intensity = np.einsum('ij,j->i', normals, self._light_dir.astype(dtype))
+        np.clip(lighting_intensity, 0.4, 1.0, out=lighting_intensity)  # Ambient lighting minimum
+        return lighting_intensity
+    
+    def _apply_curvature_shading(self, colors: np.ndarray, curvature_normalized: np.ndarray) -> np.ndarray:
+        """Apply shading based on surface curvature normalized to [0, 1] (modifies colors in place)."""
         # Areas with high curvature get slightly darker (crevices)
         curvature_factor = 1.0 - self.color_variation['curvature_influence'] * curvature_normalized
-        curvature_shaded = colors * curvature_factor.reshape(-1, 1)
+        np.multiply(colors, curvature_factor.astype(colors.dtype)[:, None], out=colors)
         
-        return curvature_shaded
+        return colors
     
-    def _apply_roughness_effects(self, colors: np.ndarray, roughness: np.ndarray) -> np.ndarray:
-        """Apply texture effects based on surface roughness."""
-        # Normalize roughness
-        roughness_normalized = (roughness - roughness.min()) / (roughness.max() - roughness.min() + 1e-8)
-        
+    def _apply_roughness_effects(self, colors: np.ndarray, roughness_normalized: np.ndarray) -> np.ndarray:
+        """Apply texture effects based on surface roughness (normalized to [0, 1])."""
         # Rough areas get slightly desaturated
         roughness_factor = 1.0 - 0.1 * roughness_normalized
         
-        # Convert to HSV for saturation adjustment
-        roughness_adjusted = colors.copy()
-        for i, (color, factor) in enumerate(zip(colors, roughness_factor)):
-            hsv_color = colorsys.rgb_to_hsv(*color)
-            new_saturation = hsv_color[1] * factor
-            roughness_adjusted[i] = np.array(colorsys.hsv_to_rgb(hsv_color[0], new_saturation, hsv_color[2]))
+        # Desaturate in HSV space (hue and value are preserved)
+        roughness_adjusted = self._scale_saturation(colors, roughness_factor)
         
         return roughness_adjusted
     
     def _apply_proximity_effects(self, vertices: np.ndarray, colors: np.ndarray,
-                               labels: np.ndarray, cluster_to_semantic: Dict) -> np.ndarray:
+                               semantic_id: np.ndarray) -> np.ndarray:
         """Apply color effects based on proximity to other semantic regions."""
-        proximity_adjusted = colors.copy()
-        
-        # Find water vertices
-        water_vertices = []
-        for i, label in enumerate(labels):
-            if cluster_to_semantic.get(label, '') == 'water':
-                water_vertices.append(i)
-        
-        if water_vertices:
-            water_coords = vertices[water_vertices]
-            
-            # Apply wetness effects to nearby non-water vertices
-            for i, (vertex, color, label) in enumerate(zip(vertices, colors, labels)):
-                semantic_type = cluster_to_semantic.get(label, 'terrain')
-                
-                if semantic_type != 'water':
-                    # Calculate distance to nearest water
-                    distances = np.linalg.norm(water_coords - vertex, axis=1)
-                    min_distance = np.min(distances)
-                    
-                    # Apply wetness effect if close to water
-                    max_wetness_distance = 0.1  # Adjust based on mesh scale
-                    if min_distance < max_wetness_distance:
-                        wetness_factor = 1.0 - (min_distance / max_wetness_distance)
-                        # Make colors darker and more saturated near water
-                        darkness_factor = 1.0 - self.color_variation['wetness_factor'] * wetness_factor * 0.3
-                        proximity_adjusted[i] *= darkness_factor
-                        
-                        # Add slight blue tint
-                        blue_tint = np.array([0, 0, 0.1]) * wetness_factor * 0.2
-                        proximity_adjusted[i] = self._blend_colors(proximity_adjusted[i], blue_tint, 0.3)
+        # Find water vertices; without water (the common case) there is nothing to do
+        water_mask = semantic_id == self.SEMANTIC_IDS['water']
+        if not water_mask.any():
+            return colors
+        
+        # Apply wetness effects to nearby non-water vertices
+        wetness = self._compute_wetness(vertices, water_mask)
+        wet = wetness > 0
+        if not wet.any():
+            return colors
+        wetness_factor = wetness[wet]
+        
+        # Make colors darker and more saturated near water, then blend 30% toward
+        # a faint blue tint; both fold into one scale plus a blue offset
+        darkness_factor = 1.0 - self.color_variation['wetness_factor'] * wetness_factor * 0.3
+        wet_colors = colors[wet] * (darkness_factor * 0.7)[:, None]
+        wet_colors[:, 2] += 0.1 * wetness_factor * 0.2 * 0.3
         
+        proximity_adjusted = colors.copy()
+        proximity_adjusted[wet] = wet_colors
         return proximity_adjusted
     
+    def _compute_wetness(self, vertices: np.ndarray, water_mask: np.ndarray,
+                         max_wetness_distance: float = 0.1) -> np.ndarray:
+        """Wetness in [0, 1] of non-water vertices near water, falling off linearly with distance."""
+        wetness = np.zeros(len(vertices), dtype=np.float32)
+        if not water_mask.any():
+            return wetness
+        
+        # Distance from every vertex to its nearest water vertex
+        distances, _ = cKDTree(vertices[water_mask]).query(
+            vertices, k=1, distance_upper_bound=max_wetness_distance
+        )
+        wet = ~water_mask & (distances < max_wetness_distance)
+        wetness[wet] = 1.0 - distances[wet] / max_wetness_distance
+        return wetness
+    
+    def _semantic_ids(self, labels: np.ndarray, cluster_to_semantic: Dict) -> np.ndarray:
+        """Integer semantic id of every vertex (unmapped clusters count as terrain, unknown types as -1)."""
+        n_clusters = int(labels.max()) + 1 if len(labels) else 0
+        cluster_ids = np.array([
+            self.SEMANTIC_IDS.get(cluster_to_semantic.get(c, 'terrain'), -1) for c in range(n_clusters)
+        ], dtype=np.int8)
+        return cluster_ids[labels]
+    
     def _add_color_noise(self, colors: np.ndarray) -> np.ndarray:
         """Add subtle color noise for natural variation."""
         noise_strength = self.color_variation['base_noise']
         
-        # Generate random noise
-        noise = np.random.normal(0, noise_strength, colors.shape)
+        # Generate random noise into a buffer reused across calls of the same shape
+        if self._noise_buf is None or self._noise_buf.shape != colors.shape:
+            self._noise_buf = np.empty(colors.shape, dtype=np.float32)
+        self._rng.standard_normal(out=self._noise_buf, dtype=np.float32)
+        self._noise_buf *= noise_strength
         
         # Apply noise
-        noisy_colors = colors + noise
+        noisy_colors = colors + self._noise_buf
         
         return noisy_colors
     
-    def _blend_colors(self, color1: np.ndarray, color2: np.ndarray, blend_factor: float) -> np.ndarray:
-        """Blend two colors together."""
-        return color1 * (1 - blend_factor) + color2 * blend_factor
+    def _normalize(self, values: np.ndarray) -> np.ndarray:
+        """Min-max normalize values to [0, 1]."""
+        minimum = values.min()
+        return ((values - minimum) / (values.max() - minimum + 1e-8)).astype(np.float32)
+    
+    def _scale_saturation(self, colors: np.ndarray, factor: Union[float, np.ndarray]) -> np.ndarray:
+        """Scale HSV saturation of RGB colors, keeping hue and value."""
+        # Each channel sits at v * (1 - s * k) for a hue-dependent k, so scaling s
+        # moves it linearly toward the value (max channel)
+        value = colors.max(axis=-1, keepdims=True)
+        factor = np.asarray(factor).reshape(-1, 1) if np.ndim(factor) else factor
+        return value - (value - colors) * factor
+    
+    def _shift_value(self, colors: np.ndarray, delta: float) -> np.ndarray:
+        """Shift HSV value (brightness) of RGB colors, keeping hue and saturation."""
+        value = colors.max(axis=-1, keepdims=True)
+        new_value = np.clip(value + delta, 0, 1)
+        # Scaling all channels by v'/v preserves hue and saturation; black becomes gray
+        scale = np.divide(new_value, value, out=np.zeros_like(value), where=value > 0)
+        return np.where(value > 0, colors * scale, new_value)
     
     def _generate_texture_map(self, vertices: np.ndarray, colors: np.ndarray, 
                             faces: np.ndarray, texture_size: int = 512) -> Optional[np.ndarray]:
@@ -381,23 +506,28 @@ class MeshColorizer:
             # Create UV coordinates (simple projection)
             uv_coords = self._generate_uv_coordinates(vertices)
             
-            # Create texture image
-            texture = np.ones((texture_size, texture_size, 3))
+            # Texel hit by each vertex
+            xs = np.clip((uv_coords[:, 0] * (texture_size - 1)).astype(np.int64), 0, texture_size - 1)
+            ys = np.clip((uv_coords[:, 1] * (texture_size - 1)).astype(np.int64), 0, texture_size - 1)
+            texels = ys * texture_size + xs
             
-            # Map vertex colors to texture
-            for i, (uv, color) in enumerate(zip(uv_coords, colors)):
-                u, v = uv
-                x = int(u * (texture_size - 1))
-                y = int(v * (texture_size - 1))
-                
-                # Apply color with some blending
-                texture[y, x] = color
+            # Map vertex colors to texture, averaging vertices that share a texel
+            n_texels = texture_size * texture_size
+            counts = np.bincount(texels, minlength=n_texels)
+            sums = np.stack([np.bincount(texels, weights=colors[:, c], minlength=n_texels)
+                             for c in range(3)], axis=1).astype(np.float32)
             
-            # Apply Gaussian blur for smoother transitions
-            for channel in range(3):
-                texture[:, :, channel] = cv2.GaussianBlur(texture[:, :, channel], (5, 5), 1.0)
+            # Create texture image (untouched texels stay white)
+            texture = np.ones((n_texels, 3), dtype=np.float32)
+            hit = counts > 0
+            texture[hit] = sums[hit] / counts[hit, None]
+            texture = texture.reshape(texture_size, texture_size, 3)
             
-            return texture
+            # Apply Gaussian blur for smoother transitions (all channels, separable passes)
+            texture = cv2.sepFilter2D(texture, -1, self._gauss_kernel, self._gauss_kernel)
+            
+            # Quantize to 8-bit RGB, the format the texture is saved in
+            return (np.clip(texture, 0, 1) * 255 + 0.5).astype(np.uint8)
             
         except Exception as e:
             print(f"  ⚠️ Could not generate texture map: {e}")
@@ -426,11 +556,13 @@ class MeshColorizer:
         labels = segmentation['labels']
         cluster_to_semantic = semantic_mapping['cluster_to_semantic']
         
-        # Count vertices per semantic category
+        # Count vertices per cluster in one pass, then fold clusters into semantic
+        # categories (in order of first appearance, as the legend is displayed)
+        clusters, first_index, cluster_counts = np.unique(labels, return_index=True, return_counts=True)
         semantic_counts = {}
-        for label in labels:
-            semantic_type = cluster_to_semantic.get(label, 'unknown')
-            semantic_counts[semantic_type] = semantic_counts.get(semantic_type, 0) + 1
+        for order in np.argsort(first_index):
+            semantic_type = cluster_to_semantic.get(clusters[order], 'unknown')
+            semantic_counts[semantic_type] = semantic_counts.get(semantic_type, 0) + int(cluster_counts[order])
         
         # Create color legend
         color_legend = {}
@@ -453,6 +585,8 @@ class MeshColorizer:
     def save_color_visualization(self, color_info: Dict, output_path: str):
         """Save a color legend visualization."""
         try:
+            import matplotlib.pyplot as plt
+            
             print(f"  📊 Saving color visualization to {output_path}...")
             
             fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
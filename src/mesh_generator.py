@@ -1,5 +1,5 @@
 import torch
-from transformers import BertTokenizer, BertModel, CLIPTextModel, CLIPTokenizer
+from transformers import DistilBertTokenizerFast, DistilBertModel, CLIPTextModel, CLIPTokenizerFast
 from shap_e.diffusion.sample import sample_latents
 from shap_e.diffusion.gaussian_diffusion import diffusion_from_config
 from shap_e.models.download import load_model, load_config
@@ -8,34 +8,67 @@ from utils.unity_utils import save_for_unity, export_unity_prefab, create_unity_
 from .mesh_analyzer import MeshAnalyzer
 from .mesh_colorizer import MeshColorizer
 import os
+import json
+import logging
+import contextlib
+import functools
 import numpy as np
 from collections import defaultdict
-import re
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 class MeshGenerator:
+    # Loaded models shared by every MeshGenerator in the process, keyed on name; device-bound
+    # models follow whichever device the generator that looks them up is on
+    _MODEL_CACHE = {}
+    
     def __init__(self):
         # Initialize device
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         
         # Load Shap-E models with higher quality settings
-        print("Loading Shap-E models...")
-        self.xm = load_model('transmitter', device=self.device)
-        self.model = load_model('text300M', device=self.device)
-        self.diffusion = diffusion_from_config(load_config('diffusion'))
-        
-        # Load BERT and CLIP models for enhanced text understanding
-        print("Loading language models...")
-        self.tokenizer = BertTokenizer.from_pretrained('bert-large-uncased')
-        self.bert_model = BertModel.from_pretrained('bert-large-uncased').to(self.device)
-        self.clip_tokenizer = CLIPTokenizer.from_pretrained("openai/clip-vit-large-patch14")
-        self.clip_model = CLIPTextModel.from_pretrained("openai/clip-vit-large-patch14").to(self.device)
+        logger.info("Loading Shap-E models...")
+        self.xm = self._cached_model('transmitter', lambda: load_model('transmitter', device=self.device))
+        self.diffusion = self._cached_model('diffusion', lambda: diffusion_from_config(load_config('diffusion')),
+                                            per_device=False)
+        self.model = self._cached_model('text300M', self._load_denoiser)
+        
+        # Rust-backed fast tokenizers for enhanced text understanding, shared process-wide
+        # like the models; the encoder models themselves are loaded on the first analyze_text call
+        self.tokenizer = self._cached_model('distilbert_tokenizer', lambda: DistilBertTokenizerFast.from_pretrained(
+            'distilbert-base-uncased'), per_device=False)
+        self.clip_tokenizer = self._cached_model('clip_tokenizer', lambda: CLIPTokenizerFast.from_pretrained(
+            "openai/clip-vit-large-patch14"), per_device=False)
+        self.bert_model = None
+        self.clip_model = None
+        
+        # Analysis results per description and pooled embeddings per text chunk
+        self._analysis_cache = {}
+        self._chunk_feature_cache = {}
+        
+        # Diffusion step budget scaled by scene complexity, and sampled latents per
+        # (description, steps, guidance) so repeated scenes skip diffusion entirely
+        self.min_karras_steps = 24
+        self.max_karras_steps = 128
+        self._latent_cache = {}
         
         # Get model max lengths
-        self.bert_max_length = self.bert_model.config.max_position_embeddings
+        self.bert_max_length = self.tokenizer.model_max_length
         self.clip_max_length = self.clip_tokenizer.model_max_length
         
         # Initialize mesh analysis and coloring components
-        print("Initializing mesh analysis and coloring systems...")
+        logger.info("Initializing mesh analysis and coloring systems...")
         self.mesh_analyzer = MeshAnalyzer(device=self.device)
         self.mesh_colorizer = MeshColorizer()
         
@@ -51,30 +84,128 @@ class MeshGenerator:
             'textures': ['rough', 'smooth', 'crisp', 'soft', 'sharp', 'jagged', 'opaque', 'transparent']
         }
         
-        print("Models loaded successfully!")
+        # Aho-Corasick automaton finding every scene keyword in one pass (when available)
+        self._keyword_automaton = None
+        if ahocorasick is not None:
+            self._keyword_automaton = ahocorasick.Automaton()
+            for keywords in self.scene_categories.values():
+                for keyword in keywords:
+                    self._keyword_automaton.add_word(keyword, keyword)
+            self._keyword_automaton.make_automaton()
+        
+        logger.info("Models loaded successfully!")
+
+    def to(self, device):
+        """Move all models to the given device, e.g. to free GPU memory while idle."""
+        self.device = torch.device(device)
+        self.xm.to(self.device)
+        self.model.to(self.device)
+        if self.bert_model is not None:
+            self.bert_model.to(self.device)
+            self.clip_model.to(self.device)
+        self.mesh_analyzer.device = self.device
+        return self
+
+    def _cached_model(self, name, loader, per_device=True):
+        """Return the process-wide instance of a model, loading it on first use.
+        
+        per_device models are torch modules and are moved to this generator's device on
+        lookup, since to() moves the shared instances in place.
+        """
+        model = MeshGenerator._MODEL_CACHE.get(name)
+        if model is None:
+            model = MeshGenerator._MODEL_CACHE[name] = loader()
+        elif per_device:
+            model.to(self.device)
+        return model
+
+    def _compile_enabled(self):
+        """Whether models should go through torch.compile (CUDA only; TEXT_TO_MESH_COMPILE=0 disables)."""
+        return (self.device.type == 'cuda' and hasattr(torch, 'compile')
+                and os.environ.get('TEXT_TO_MESH_COMPILE', '1') == '1')
+
+    def _load_denoiser(self):
+        """Load the Shap-E text300M denoiser, compiled and warmed up when running on CUDA."""
+        model = load_model('text300M', device=self.device)
+        
+        if self._compile_enabled():
+            # Fuse the per-step LayerNorm/bias/activation/residual epilogues into the GEMMs.
+            # CUDA graphs stay off because main.py parks the models on the CPU between prompts.
+            logger.info("Compiling Shap-E denoiser...")
+            model = torch.compile(model, mode='max-autotune-no-cudagraphs', dynamic=False)
+            
+            # A short sampling run so compilation and autotuning don't land on the first prompt
+            self._sample_latents(model, 'a cube', karras_steps=2)
+        return model
+
+    def _sample_latents(self, model, text_description, karras_steps, guidance_scale=20.0):
+        """Run Shap-E diffusion for one prompt, autocasting to BF16 where the GPU supports it."""
+        # sample_latents opens its own autocast region without a dtype, which inherits the
+        # dtype of an enclosing region, so a local BF16 region covers it (same tensor-core
+        # rate as FP16, FP32 dynamic range) without touching the process-wide default
+        use_bf16 = self.device.type == 'cuda' and torch.cuda.is_bf16_supported()
+        autocast = torch.autocast('cuda', dtype=torch.bfloat16) if use_bf16 else contextlib.nullcontext()
+        
+        with autocast:
+            return sample_latents(
+                batch_size=1,
+                model=model,
+                diffusion=self.diffusion,
+                guidance_scale=guidance_scale,
+                model_kwargs=dict(texts=[text_description]),
+                progress=True,
+                clip_denoised=True,
+                use_fp16=True,
+                use_karras=True,
+                karras_steps=karras_steps,
+                sigma_min=1e-3,
+                sigma_max=160,
+                s_churn=0.1  # Added for better detail
+            )
+
+    def _load_text_models(self):
+        """Load the DistilBERT and CLIP text encoders used by analyze_text."""
+        self.bert_model = self._cached_model('distilbert', lambda: self._load_text_encoder(
+            DistilBertModel, 'distilbert-base-uncased'))
+        self.clip_model = self._cached_model('clip_text', lambda: self._load_text_encoder(
+            CLIPTextModel, "openai/clip-vit-large-patch14"))
+
+    def _load_text_encoder(self, model_class, name):
+        """Load one text encoder in eval mode on this device."""
+        logger.info("Loading language model %s...", name)
+        model = model_class.from_pretrained(name).to(self.device).eval()
+        
+        # Let inductor fuse the encoder's elementwise epilogues into its GEMMs
+        # (set TEXT_TO_MESH_COMPILE=0 to run it eagerly). No CUDA graphs, as with the
+        # denoiser: the encoders also move to the CPU between prompts
+        if self._compile_enabled():
+            model = torch.compile(model, mode='max-autotune-no-cudagraphs', dynamic=True)
+        return model
 
     def chunk_text(self, text):
         """Split text into meaningful chunks that respect natural language boundaries."""
-        # Split by commas and other natural breaks
-        chunks = re.split(r'[,;]\s*', text)
+        # Split by commas and other natural breaks, dropping whitespace after each break
+        pieces = text.replace(';', ',').split(',')
+        chunks = pieces[:1] + [piece.lstrip() for piece in pieces[1:]]
         
         # Process chunks to ensure they're within length limits
         processed_chunks = []
-        current_chunk = ""
         
         for chunk in chunks:
-            # If chunk is too long, split it further by spaces
+            # If chunk is too long, split it further by spaces into greedy word groups
             if len(chunk) > self.bert_max_length:
                 words = chunk.split()
-                temp_chunk = ""
-                for word in words:
-                    if len(temp_chunk) + len(word) + 1 <= self.bert_max_length:
-                        temp_chunk += " " + word if temp_chunk else word
+                group_start = 0
+                group_length = 0
+                for i, word in enumerate(words):
+                    if i > group_start and group_length + len(word) + 1 > self.bert_max_length:
+                        processed_chunks.append(" ".join(words[group_start:i]))
+                        group_start = i
+                        group_length = len(word)
                     else:
-                        processed_chunks.append(temp_chunk)
-                        temp_chunk = word
-                if temp_chunk:
-                    processed_chunks.append(temp_chunk)
+                        group_length += len(word) + (1 if i > group_start else 0)
+                if group_start < len(words):
+                    processed_chunks.append(" ".join(words[group_start:]))
             else:
                 processed_chunks.append(chunk)
         
@@ -82,54 +213,93 @@ class MeshGenerator:
 
     def analyze_text(self, text_description):
         """Enhanced text analysis that handles long descriptions by chunking."""
-        # Split text into manageable chunks
-        chunks = self.chunk_text(text_description)
+        # Identical descriptions always analyze the same way, so reuse earlier results
+        cached = self._analysis_cache.get(text_description)
+        if cached is None:
+            cached = self._analyze_text_uncached(text_description)
+            self._cache_put(self._analysis_cache, text_description, cached)
         
-        # Initialize combined results
-        combined_scene_elements = defaultdict(list)
-        combined_features = None
+        # Hand out fresh containers so callers cannot modify the cached analysis
+        return {
+            'features': cached['features'],
+            'scene_elements': {category: list(elements) for category, elements in cached['scene_elements'].items()},
+            'materials': {key: list(value) if isinstance(value, list) else value
+                          for key, value in cached['materials'].items()},
+            'environment_type': cached['environment_type'],
+            'complexity': cached['complexity']
+        }
+
+    def _cache_put(self, cache, key, value, maxsize=128):
+        """Insert into a bounded cache, evicting the oldest entry when full."""
+        if len(cache) >= maxsize:
+            cache.pop(next(iter(cache)))
+        cache[key] = value
+
+    def _encode_chunks(self, chunks):
+        """Pooled BERT+CLIP embedding of each chunk, encoding only chunks not seen before."""
+        missing = list(dict.fromkeys(chunk for chunk in chunks if chunk not in self._chunk_feature_cache))
         
-        print("\nAnalyzing text in chunks:")
-        for i, chunk in enumerate(chunks, 1):
-            print(f"Processing chunk {i}/{len(chunks)}: '{chunk}'")
+        if missing:
+            if self.bert_model is None:
+                self._load_text_models()
             
-            # Process BERT
-            inputs = self.tokenizer(chunk, 
+            inputs = self.tokenizer(missing, 
                                   return_tensors="pt", 
                                   padding=True, 
                                   truncation=True, 
                                   max_length=self.bert_max_length).to(self.device)
-            with torch.no_grad():
-                bert_outputs = self.bert_model(**inputs)
-            
-            # Process CLIP
-            clip_inputs = self.clip_tokenizer(chunk, 
+            clip_inputs = self.clip_tokenizer(missing, 
                                             return_tensors="pt", 
                                             padding=True, 
                                             truncation=True, 
                                             max_length=self.clip_max_length).to(self.device)
-            with torch.no_grad():
+            
+            # Process all new chunks through BERT and CLIP in one padded batch each; the pooled
+            # embeddings are only max-reduced, so half precision is plenty on the GPU
+            with torch.inference_mode(), torch.autocast(device_type=self.device.type, dtype=torch.float16,
+                                                        enabled=self.device.type == 'cuda'):
+                bert_outputs = self.bert_model(**inputs)
                 clip_outputs = self.clip_model(**clip_inputs)
             
-            # Combine embeddings
+            # Combine embeddings per chunk (DistilBERT has no pooler, so use its [CLS] state)
             chunk_features = torch.cat([
-                bert_outputs.pooler_output,
-                clip_outputs.pooler_output
+                bert_outputs.last_hidden_state[:, 0].float(),
+                clip_outputs.pooler_output.float()
             ], dim=-1)
-            
-            # Update combined features
-            if combined_features is None:
-                combined_features = chunk_features
-            else:
-                combined_features = torch.max(combined_features, chunk_features)
-            
-            # Analyze scene elements in this chunk
-            chunk_lower = chunk.lower()
-            for category, keywords in self.scene_categories.items():
-                for keyword in keywords:
-                    if keyword in chunk_lower:
-                        if keyword not in combined_scene_elements[category]:
-                            combined_scene_elements[category].append(keyword)
+            # Cached on the CPU so entries stay valid when the models move between devices
+            for chunk, features in zip(missing, chunk_features.cpu()):
+                self._cache_put(self._chunk_feature_cache, chunk, features)
+        
+        return torch.stack([self._chunk_feature_cache[chunk] for chunk in chunks])
+
+    def _find_keywords(self, text_lower):
+        """Set of scene keywords occurring anywhere in the lowercased text."""
+        if self._keyword_automaton is not None:
+            return {keyword for _, keyword in self._keyword_automaton.iter(text_lower)}
+        return {keyword for keywords in self.scene_categories.values()
+                for keyword in keywords if keyword in text_lower}
+
+    def _analyze_text_uncached(self, text_description):
+        """Chunk, encode and keyword-analyze a description."""
+        # Split text into manageable chunks
+        chunks = self.chunk_text(text_description)
+        
+        # Initialize combined results
+        combined_scene_elements = defaultdict(list)
+        
+        logger.info("\nAnalyzing text in chunks:")
+        for i, chunk in enumerate(chunks, 1):
+            logger.info("Processing chunk %d/%d: '%s'", i, len(chunks), chunk)
+        
+        # Max-reduce the per-chunk embeddings across chunks
+        combined_features = self._encode_chunks(chunks).amax(dim=0, keepdim=True)
+        
+        # Analyze scene elements across all chunks (newlines keep matches within a chunk)
+        found_keywords = self._find_keywords("\n".join(chunks).lower())
+        for category, keywords in self.scene_categories.items():
+            for keyword in keywords:
+                if keyword in found_keywords:
+                    combined_scene_elements[category].append(keyword)
         
         # Determine materials based on combined analysis
         materials = {
@@ -141,15 +311,15 @@ class MeshGenerator:
         # Process water features
         if combined_scene_elements['water_features']:
             materials['secondary'].append('water')
-            if any('hot spring' in feat for feat in combined_scene_elements['water_features']):
+            if 'hot spring' in found_keywords:
                 materials['details'].append('geothermal')
         
         # Process landscape features
-        if any(k in str(combined_scene_elements) for k in ['mountain', 'cliff', 'rock', 'boulder']):
+        if found_keywords & {'mountain', 'cliff', 'rock', 'boulder'}:
             materials['secondary'].append('rock')
         
         # Process vegetation
-        if any(k in str(combined_scene_elements) for k in ['grass', 'flower', 'tree', 'forest', 'lupine']):
+        if found_keywords & {'grass', 'flower', 'tree', 'forest', 'lupine'}:
             materials['secondary'].append('grass')
             materials['details'].append('vegetation')
         
@@ -170,19 +340,22 @@ class MeshGenerator:
     def determine_environment_type(self, scene_elements):
         """Determine the primary environment type based on scene elements."""
         # Check for mixed environments first
-        has_water = bool(scene_elements.get('water_features', []))
-        has_mountains = any('mountain' in feat for feat in scene_elements.get('landscape_features', []))
-        has_vegetation = bool(scene_elements.get('vegetation', []))
+        # Element lists hold whole keywords, so plain membership tests suffice
+        water_features = scene_elements.get('water_features', ())
+        vegetation = scene_elements.get('vegetation', ())
+        has_water = bool(water_features)
+        has_mountains = 'mountain' in scene_elements.get('landscape_features', ())
+        has_vegetation = bool(vegetation)
         
         if has_water and has_mountains and has_vegetation:
             return 'mixed_landscape'
-        elif has_water and 'hot spring' in str(scene_elements):
+        elif has_water and 'hot spring' in water_features:
             return 'geothermal'
         elif has_mountains:
             return 'mountain'
         elif has_water:
             return 'water'
-        elif 'tundra' in str(scene_elements):
+        elif 'tundra' in vegetation:
             return 'tundra'
         elif has_vegetation:
             return 'vegetation'
@@ -211,69 +384,67 @@ class MeshGenerator:
 
     def generate_mesh(self, text_description):
         """Generate a detailed mesh from a complex text description using Shap-E."""
-        print(f"\nAnalyzing scene: '{text_description}'")
+        logger.info("\nAnalyzing scene: '%s'", text_description)
         text_analysis = self.analyze_text(text_description)
         
         # Adjust generation parameters based on scene complexity
-        batch_size = 1
         guidance_scale = 20.0  # Increased for better prompt adherence
-        karras_steps = max(64, int(128 * text_analysis['complexity']))  # More steps for complex scenes
+        karras_steps = max(self.min_karras_steps, int(self.max_karras_steps * text_analysis['complexity']))  # More steps for complex scenes
         
-        print("\nScene analysis results:")
+        logger.info("\nScene analysis results:")
         for category, elements in text_analysis['scene_elements'].items():
             if elements:
-                print(f"- {category}: {', '.join(elements)}")
-        print(f"- Environment type: {text_analysis['environment_type']}")
-        print(f"- Scene complexity: {text_analysis['complexity']:.2f}")
-        
-        print("\nGenerating 3D mesh with enhanced parameters...")
-        # Generate latents with Shap-E
-        latents = sample_latents(
-            batch_size=batch_size,
-            model=self.model,
-            diffusion=self.diffusion,
-            guidance_scale=guidance_scale,
-            model_kwargs=dict(texts=[text_description]),
-            progress=True,
-            clip_denoised=True,
-            use_fp16=True,
-            use_karras=True,
-            karras_steps=karras_steps,
-            sigma_min=1e-3,
-            sigma_max=160,
-            s_churn=0.1  # Added for better detail
-        )
+                logger.info("- %s: %s", category, ', '.join(elements))
+        logger.info("- Environment type: %s", text_analysis['environment_type'])
+        logger.info("- Scene complexity: %.2f", text_analysis['complexity'])
+        
+        logger.info("\nGenerating 3D mesh with enhanced parameters...")
+        # Generate latents with Shap-E (latents are ~4 MB each, so keep a small cache)
+        latent_key = (text_description, karras_steps, guidance_scale)
+        latent = self._latent_cache.get(latent_key)
+        if latent is None:
+            latent = self._sample_latents(self.model, text_description, karras_steps, guidance_scale)[0]
+            self._cache_put(self._latent_cache, latent_key, latent, maxsize=16)
+        else:
+            logger.info("Reusing latents from an earlier run of this scene")
         
         # Convert latent to mesh with higher detail
-        print("Converting latent to high-detail mesh...")
-        latent = latents[0]
+        logger.info("Converting latent to high-detail mesh...")
         mesh = decode_latent_mesh(self.xm, latent).tri_mesh()
+        # Shap-E's TriMesh stores vertices as `verts`; take both counts once
+        n_vertices = len(mesh.verts if hasattr(mesh, 'verts') else mesh.vertices)
+        n_faces = len(mesh.faces)
         
-        # Create optimized collision mesh
-        print("Generating optimized collision mesh...")
-        collision_mesh = mesh.convex_hull()  # Using convex hull instead of decimation
+        # Create optimized collision mesh on a worker thread while the mesh is analyzed below
+        logger.info("Generating optimized collision mesh...")
+        hull_executor = ThreadPoolExecutor(max_workers=1)
+        collision_future = hull_executor.submit(self._collision_hull, mesh)  # Using convex hull instead of decimation
         
         # Set materials based on analysis
         material_type = text_analysis['environment_type']
         physics_type = 'terrain'  # Default physics type
         
         # Calculate confidence based on mesh complexity and scene understanding
-        vertex_confidence = min(1.0, len(mesh.vertices) / 20000)
+        vertex_confidence = min(1.0, n_vertices / 20000)
         scene_confidence = text_analysis['complexity']
         confidence = (vertex_confidence + scene_confidence) / 2
         
-        print(f"\nMesh generated successfully:")
-        print(f"- Vertices: {len(mesh.vertices)}")
-        print(f"- Faces: {len(mesh.faces)}")
-        print(f"- Primary material: {material_type}")
-        print(f"- Secondary materials: {', '.join(text_analysis['materials']['secondary'])}")
-        print(f"- Detail elements: {', '.join(text_analysis['materials']['details'])}")
-        print(f"- Generation quality: {karras_steps} steps at {guidance_scale:.1f}x guidance")
-        print(f"- Confidence: {confidence:.2f}")
+        logger.info("\nMesh generated successfully:")
+        logger.info("- Vertices: %d", n_vertices)
+        logger.info("- Faces: %d", n_faces)
+        logger.info("- Primary material: %s", material_type)
+        logger.info("- Secondary materials: %s", ', '.join(text_analysis['materials']['secondary']))
+        logger.info("- Detail elements: %s", ', '.join(text_analysis['materials']['details']))
+        logger.info("- Generation quality: %d steps at %.1fx guidance", karras_steps, guidance_scale)
+        logger.info("- Confidence: %.2f", confidence)
         
         # Perform mesh analysis and semantic segmentation
-        print("\n🧠 Analyzing mesh geometry and semantics...")
-        analysis_results = self.mesh_analyzer.analyze_mesh(mesh, text_description)
+        logger.info("\n🧠 Analyzing mesh geometry and semantics...")
+        try:
+            analysis_results = self.mesh_analyzer.analyze_mesh(mesh, text_description)
+            collision_mesh = collision_future.result()
+        finally:
+            hull_executor.shutdown()
         
         # Apply intelligent coloring based on analysis
         environment_type = self._map_environment_type(text_analysis['environment_type'])
@@ -286,59 +457,81 @@ class MeshGenerator:
         vertex_colors = color_results['vertex_colors']
         mesh = self._apply_vertex_colors_to_mesh(mesh, vertex_colors)
         
-        print(f"\n🎨 Mesh coloring complete:")
-        print(f"- Environment type: {color_results['environment_type']}")
-        print(f"- Semantic regions: {color_results['color_info']['unique_semantics']}")
-        print(f"- Color categories: {list(color_results['color_info']['color_legend'].keys())}")
+        logger.info("\n🎨 Mesh coloring complete:")
+        logger.info("- Environment type: %s", color_results['environment_type'])
+        logger.info("- Semantic regions: %s", color_results['color_info']['unique_semantics'])
+        logger.info("- Color categories: %s", list(color_results['color_info']['color_legend']))
         
         return mesh, collision_mesh, confidence, material_type, physics_type, analysis_results, color_results
     
+    def _collision_hull(self, mesh):
+        """Convex hull of the mesh, computed by Qhull on grid-deduplicated vertices."""
+        try:
+            import trimesh
+            from scipy.spatial import ConvexHull
+        except ImportError:
+            return mesh.convex_hull()
+        
+        # Only extremal points shape the hull, so collapse vertices onto a grid of
+        # 1/256 of the bounding-box diagonal before handing them to Qhull
+        vertices = np.asarray(mesh.verts if hasattr(mesh, 'verts') else mesh.vertices)
+        voxel = np.linalg.norm(np.ptp(vertices, axis=0)) / 256 or 1.0
+        _, keep = np.unique(np.round(vertices / voxel).astype(np.int32), axis=0, return_index=True)
+        points = vertices[keep]
+        hull = ConvexHull(points)
+        
+        # Reindex the simplices onto the hull's own vertices
+        remap = np.empty(len(points), dtype=np.int64)
+        remap[hull.vertices] = np.arange(len(hull.vertices))
+        hull_vertices = points[hull.vertices]
+        faces = remap[hull.simplices]
+        
+        # Qhull doesn't orient its simplices; flip those whose winding disagrees with the facet normal
+        triangles = hull_vertices[faces]
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        flip = np.einsum('ij,ij->i', normals, hull.equations[:, :3]) < 0
+        faces[flip] = faces[flip][:, ::-1]
+        
+        return trimesh.Trimesh(vertices=hull_vertices, faces=faces, process=False)
+    
+    def _write_json(self, data, filename: str):
+        """Write data as indented JSON; numpy arrays and scalars are serialized natively."""
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                                     | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(data, f, indent=2, default=lambda obj: obj.tolist())
+
     def _save_color_info(self, color_results: dict, filename: str):
         """Save color information to JSON file."""
-        import json
-        
-        # Convert numpy arrays to lists for JSON serialization
-        color_info = color_results['color_info'].copy()
-        for category, info in color_info.get('color_legend', {}).items():
-            if 'color' in info:
-                info['color'] = info['color'].tolist()
-        
-        # Convert color palette
-        color_palette = {}
-        for category, color in color_results['color_palette'].items():
-            color_palette[category] = color.tolist()
-        
         save_data = {
             'environment_type': color_results['environment_type'],
-            'color_info': color_info,
-            'color_palette': color_palette
+            'color_info': color_results['color_info'],
+            'color_palette': color_results['color_palette']
         }
         
-        with open(filename, 'w') as f:
-            json.dump(save_data, f, indent=2)
+        self._write_json(save_data, filename)
     
     def _save_texture_map(self, texture_map: np.ndarray, filename: str):
         """Save texture map as PNG image."""
         try:
-            import matplotlib.pyplot as plt
-            plt.figure(figsize=(8, 8))
-            plt.imshow(texture_map)
-            plt.axis('off')
-            plt.title('Generated Texture Map')
-            plt.savefig(filename, bbox_inches='tight', dpi=150)
-            plt.close()
+            from PIL import Image
+            if texture_map.dtype != np.uint8:
+                texture_map = (texture_map * 255).astype(np.uint8)
+            # Fast, lightly compressed encode; these are intermediate artifacts
+            Image.fromarray(texture_map).save(filename, optimize=False, compress_level=1)
         except Exception as e:
-            print(f"Warning: Could not save texture map: {e}")
+            logger.warning("Could not save texture map: %s", e)
     
     def _save_analysis_results(self, analysis_results: dict, filename: str):
         """Save mesh analysis results to JSON file."""
-        import json
-        
         # Prepare data for JSON serialization (exclude complex objects)
         save_data = {
             'segmentation': {
                 'n_clusters': analysis_results['segmentation']['n_clusters'],
-                'cluster_sizes': analysis_results['segmentation']['cluster_sizes'].tolist(),
+                'cluster_sizes': analysis_results['segmentation']['cluster_sizes'],
                 'labels_summary': {
                     'unique_labels': len(np.unique(analysis_results['segmentation']['labels'])),
                     'total_vertices': len(analysis_results['segmentation']['labels'])
@@ -364,12 +557,15 @@ class MeshGenerator:
             }
         }
         
-        with open(filename, 'w') as f:
-            json.dump(save_data, f, indent=2)
+        self._write_json(save_data, filename)
 
     def save_mesh(self, mesh, collision_mesh, filename, material_type='default', physics_type='default', 
-                  analysis_results=None, color_results=None):
-        """Save the generated mesh with enhanced Unity integration and coloring."""
+                  analysis_results=None, color_results=None, parallel=True):
+        """Save the generated mesh with enhanced Unity integration and coloring.
+        
+        The independent JSON and texture writes run on a small thread pool unless
+        parallel=False; the visual and collision OBJs are written by the prefab export.
+        """
         # Create output directory if it doesn't exist
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         
@@ -379,56 +575,62 @@ class MeshGenerator:
         collision_filename = f"{base}_collision.obj"
         prefab_filename = f"{base}_prefab.json"
         
-        # Save meshes with optimized settings
-        print("\nSaving Unity-ready files with intelligent coloring...")
-        with open(visual_filename, 'w') as f:
-            mesh.write_obj(f)
-        with open(collision_filename, 'w') as f:
-            collision_mesh.write_obj(f)
-        
-        # Save color information and analysis results
+        # Independent JSON and texture writes
+        logger.info("\nSaving Unity-ready files with intelligent coloring...")
+        writes = []
         if color_results:
             # Save color palette information
-            color_info_filename = f"{base}_color_info.json"
-            self._save_color_info(color_results, color_info_filename)
-            
-            # Save color visualization
-            color_viz_filename = f"{base}_color_legend.png"
-            self.mesh_colorizer.save_color_visualization(color_results['color_info'], color_viz_filename)
-            
-            # Save texture map if available
-            if color_results.get('texture_map') is not None:
-                texture_filename = f"{base}_texture.png"
-                self._save_texture_map(color_results['texture_map'], texture_filename)
-        
-        # Save analysis results
+            writes.append((self._save_color_info, color_results, f"{base}_color_info.json"))
         if analysis_results:
-            analysis_filename = f"{base}_analysis.json"
-            self._save_analysis_results(analysis_results, analysis_filename)
-        
-        # Export as Unity prefab with enhanced materials and physics
+            # Save analysis results
+            writes.append((self._save_analysis_results, analysis_results, f"{base}_analysis.json"))
+        if color_results and color_results.get('texture_map') is not None:
+            # Save texture map
+            writes.append((self._save_texture_map, color_results['texture_map'], f"{base}_texture.png"))
+        
+        # The color legend is rendered with pyplot, which is not thread-safe, so it stays
+        # on this thread (overlapping the pooled writes when running in parallel)
+        color_viz_filename = f"{base}_color_legend.png"
+        if parallel:
+            # Leaving the block waits for every write, even if the legend or a write raised
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(write, *args) for write, *args in writes]
+                if color_results:
+                    # Save color visualization
+                    self.mesh_colorizer.save_color_visualization(color_results['color_info'], color_viz_filename)
+                for future in futures:
+                    future.result()
+        else:
+            for write, *args in writes:
+                write(*args)
+            if color_results:
+                # Save color visualization
+                self.mesh_colorizer.save_color_visualization(color_results['color_info'], color_viz_filename)
+        
+        # Export as Unity prefab with enhanced materials and physics (this also writes
+        # the visual and collision OBJs)
         prefab_data = export_unity_prefab(mesh, collision_mesh, visual_filename, material_type, physics_type)
         
-        print(f"\nUnity-ready files saved:")
-        print(f"- Visual mesh: {visual_filename}")
-        print(f"- Collision mesh: {collision_filename}")
-        print(f"- Prefab data: {prefab_filename}")
+        logger.info("\nUnity-ready files saved:")
+        logger.info("- Visual mesh: %s", visual_filename)
+        logger.info("- Collision mesh: %s", collision_filename)
+        logger.info("- Prefab data: %s", prefab_filename)
         if color_results:
-            print(f"- Color information: {base}_color_info.json")
-            print(f"- Color legend: {base}_color_legend.png")
+            logger.info("- Color information: %s_color_info.json", base)
+            logger.info("- Color legend: %s_color_legend.png", base)
             if color_results.get('texture_map') is not None:
-                print(f"- Texture map: {base}_texture.png")
+                logger.info("- Texture map: %s_texture.png", base)
         if analysis_results:
-            print(f"- Mesh analysis: {base}_analysis.json")
-        
-        print("Unity properties:")
-        print(f"- Scale: 1 unit = 10 meters in Unity (10x scaled)")
-        print(f"- Coordinate system: Adjusted for Unity (left-handed)")
-        print(f"- Rotation: 90° on X-axis applied")
-        print(f"- Colors: Intelligent semantic vertex colors applied")
-        print(f"- Material: {material_type} with advanced shaders")
-        print(f"- Physics: {physics_type} material with optimized collision")
-        print(f"- Included: Normals, UV coordinates, semantic colors, and Unity metadata")
+            logger.info("- Mesh analysis: %s_analysis.json", base)
+        
+        logger.info("Unity properties:")
+        logger.info("- Scale: 1 unit = 10 meters in Unity (10x scaled)")
+        logger.info("- Coordinate system: Adjusted for Unity (left-handed)")
+        logger.info("- Rotation: 90° on X-axis applied")
+        logger.info("- Colors: Intelligent semantic vertex colors applied")
+        logger.info("- Material: %s with advanced shaders", material_type)
+        logger.info("- Physics: %s material with optimized collision", physics_type)
+        logger.info("- Included: Normals, UV coordinates, semantic colors, and Unity metadata")
 
     def save_mesh_simple(self, mesh, filename):
         """Legacy method for backward compatibility."""
@@ -456,13 +658,24 @@ class MeshGenerator:
             if mesh.vertex_channels is None:
                 mesh.vertex_channels = {}
             
-            # Set RGB channels
-            mesh.vertex_channels['R'] = vertex_colors[:, 0]
-            mesh.vertex_channels['G'] = vertex_colors[:, 1]
-            mesh.vertex_channels['B'] = vertex_colors[:, 2]
-        
-        # For trimesh objects, set visual colors
+            # Set RGB channels from contiguous rows of one transposed copy
+            # rather than three strided column views
+            r, g, b = np.ascontiguousarray(vertex_colors.T)
+            mesh.vertex_channels['R'] = r
+            mesh.vertex_channels['G'] = g
+            mesh.vertex_channels['B'] = b
+        
+        # For trimesh objects, set visual colors (scaled straight into the uint8 buffer,
+        # truncating like astype, without a float temporary)
         elif hasattr(mesh, 'visual'):
-            mesh.visual.vertex_colors = (vertex_colors * 255).astype(np.uint8)
+            colors_uint8 = np.empty(vertex_colors.shape, dtype=np.uint8)
+            np.multiply(vertex_colors, 255, out=colors_uint8, casting='unsafe')
+            mesh.visual.vertex_colors = colors_uint8
         
-        return mesh 
\ No newline at end of file
+        return mesh 
+
+
+@functools.lru_cache(maxsize=1)
+def get_generator() -> MeshGenerator:
+    """Return the process-wide MeshGenerator, loading the models on first use."""
+    return MeshGenerator()
@@ -3,6 +3,7 @@
 Test script for basic shape generation with transformations
 """
 
+import logging
 import os
 from src.mesh_generator import MeshGenerator
 
@@ -64,4 +65,6 @@ def test_basic_shapes():
     print("Check the 'output' directory for generated meshes.")
 
 if __name__ == "__main__":
+    # MeshGenerator reports progress through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     test_basic_shapes() 
\ No newline at end of file
@@ -3,6 +3,7 @@
 Test script for terrain generation capabilities
 """
 
+import logging
 import os
 from src.mesh_generator import MeshGenerator
 
@@ -54,4 +55,6 @@ def test_terrain_generation():
     print("Check the 'output' directory for generated meshes.")
 
 if __name__ == "__main__":
+    # MeshGenerator reports progress through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     test_terrain_generation() 
\ No newline at end of file
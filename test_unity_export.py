@@ -4,6 +4,8 @@ Test script for Unity-ready mesh generation with materials and physics.
 This script demonstrates the complete Unity export pipeline.
 """
 
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from src.mesh_generator import MeshGenerator
 import os
 
@@ -63,55 +65,69 @@ def test_unity_export():
     successful_tests = 0
     total_tests = len(test_cases)
     
-    for i, test_case in enumerate(test_cases, 1):
-        print(f"\n--- Test {i}/{total_tests}: {test_case['description']} ---")
+    # Generation shares the generator's models and runs in order; each save is
+    # handed to a worker so its file I/O overlaps the next generation
+    pending = []
+    with ThreadPoolExecutor(max_workers=min(total_tests, os.cpu_count() or 1)) as executor:
+        for test_case in test_cases:
+            try:
+                # Generate the mesh
+                mesh, collision_mesh, confidence, material_type, physics_type = generator.generate_mesh(test_case['description'])
+                
+                # Create filename
+                safe_description = "".join(c for c in test_case['description'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
+                safe_description = safe_description.replace(' ', '_')
+                filename = f"output/test_unity_{safe_description}.obj"
+                
+                # Save with Unity optimization
+                future = executor.submit(generator.save_mesh, mesh, collision_mesh, filename, material_type, physics_type)
+                pending.append((test_case, future, (mesh, collision_mesh, confidence, material_type, physics_type, filename)))
+            except Exception as e:
+                pending.append((test_case, None, e))
         
-        try:
-            # Generate the mesh
-            mesh, collision_mesh, confidence, material_type, physics_type = generator.generate_mesh(test_case['description'])
+        for i, (test_case, future, result) in enumerate(pending, 1):
+            print(f"\n--- Test {i}/{total_tests}: {test_case['description']} ---")
             
-            # Create filename
-            safe_description = "".join(c for c in test_case['description'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            safe_description = safe_description.replace(' ', '_')
-            filename = f"output/test_unity_{safe_description}.obj"
-            
-            # Save with Unity optimization
-            generator.save_mesh(mesh, collision_mesh, filename, material_type, physics_type)
-            
-            # Verify results
-            print(f"✅ Generated successfully!")
-            print(f"   - Material: {material_type} (expected: {test_case['expected_material']})")
-            print(f"   - Physics: {physics_type} (expected: {test_case['expected_physics']})")
-            print(f"   - Confidence: {confidence:.2f}")
-            print(f"   - Vertices: {len(mesh.vertices)}")
-            print(f"   - Collision vertices: {len(collision_mesh.vertices)}")
-            
-            # Check if files were created
-            visual_file = filename
-            collision_file = filename.replace('.obj', '_collision.obj')
-            prefab_file = filename.replace('.obj', '_prefab.json')
-            
-            files_exist = all(os.path.exists(f) for f in [visual_file, collision_file, prefab_file])
-            
-            if files_exist:
-                print(f"   - Files created: ✓")
-                successful_tests += 1
-            else:
-                print(f"   - Files created: ✗")
-            
-            # Verify material and physics types
-            material_match = material_type == test_case['expected_material']
-            physics_match = physics_type == test_case['expected_physics']
-            
-            if material_match and physics_match:
-                print(f"   - Material/Physics match: ✓")
-            else:
-                print(f"   - Material/Physics match: ✗")
-                print(f"     Expected: {test_case['expected_material']}/{test_case['expected_physics']}")
-                print(f"     Got: {material_type}/{physics_type}")
-            
-        except Exception as e:
-            print(f"❌ Test failed: {str(e)}")
+            try:
+                if future is None:
+                    raise result
+                future.result()
+                mesh, collision_mesh, confidence, material_type, physics_type, filename = result
+                
+                # Verify results
+                print(f"✅ Generated successfully!")
+                print(f"   - Material: {material_type} (expected: {test_case['expected_material']})")
+                print(f"   - Physics: {physics_type} (expected: {test_case['expected_physics']})")
+                print(f"   - Confidence: {confidence:.2f}")
+                print(f"   - Vertices: {len(mesh.vertices)}")
+                print(f"   - Collision vertices: {len(collision_mesh.vertices)}")
+                
+                # Check if files were created
+                visual_file = filename
+                collision_file = filename.replace('.obj', '_collision.obj')
+                prefab_file = filename.replace('.obj', '_prefab.json')
+                
+                files_exist = all(os.path.exists(f) for f in [visual_file, collision_file, prefab_file])
+                
+                if files_exist:
+                    print(f"   - Files created: ✓")
+                    successful_tests += 1
+                else:
+                    print(f"   - Files created: ✗")
+                
+                # Verify material and physics types
+                material_match = material_type == test_case['expected_material']
+                physics_match = physics_type == test_case['expected_physics']
+                
+                if material_match and physics_match:
+                    print(f"   - Material/Physics match: ✓")
+                else:
+                    print(f"   - Material/Physics match: ✗")
+                    print(f"     Expected: {test_case['expected_material']}/{test_case['expected_physics']}")
+                    print(f"     Got: {material_type}/{physics_type}")
+                
+            except Exception as e:
+                print(f"❌ Test failed: {str(e)}")
     
     # Summary
     print(f"\n=== Test Summary ===")
@@ -173,4 +189,6 @@ def main():
         print("\n⚠️  Some tests failed. Please check the output above.")
 
 if __name__ == "__main__":
+    # MeshGenerator reports progress through logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     main() 
\ No newline at end of file
@@ -1,46 +1,81 @@
+import math
+from types import MappingProxyType
 import numpy as np
 import trimesh
 from scipy.spatial import ConvexHull
 
+# Corners and triangles of the box spanning [-1, 1]^3, scaled and offset per collision box
+_UNIT_BOX_VERTS = np.array([
+    [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+    [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]
+], dtype=np.float64)
+_BOX_FACES = np.array([
+    [0, 1, 2], [0, 2, 3],  # bottom
+    [4, 7, 6], [4, 6, 5],  # top
+    [0, 4, 5], [0, 5, 1],  # front
+    [2, 6, 7], [2, 7, 3],  # back
+    [0, 3, 7], [0, 7, 4],  # left
+    [1, 5, 6], [1, 6, 2]   # right
+], dtype=np.int64)
+
+# Physics materials by terrain type, built once. Only the outer mapping is read-only, so
+# create_physics_material hands out copies of the entries
+_PHYSICS_MATERIALS = MappingProxyType({
+    'default': {
+        'friction': 0.6,
+        'bounciness': 0.0,
+        'density': 1.0
+    },
+    'grass': {
+        'friction': 0.8,
+        'bounciness': 0.1,
+        'density': 0.8
+    },
+    'rock': {
+        'friction': 0.4,
+        'bounciness': 0.2,
+        'density': 2.5
+    },
+    'sand': {
+        'friction': 0.9,
+        'bounciness': 0.0,
+        'density': 1.6
+    },
+    'water': {
+        'friction': 0.1,
+        'bounciness': 0.0,
+        'density': 1.0,
+        'is_fluid': True
+    },
+    'snow': {
+        'friction': 0.7,
+        'bounciness': 0.3,
+        'density': 0.3
+    }
+})
+
+# Constant parts of the water and wind physics descriptions
+_WATER_PHYSICS_CONSTANTS = MappingProxyType({
+    'flow_speed': 1.0,
+    'viscosity': 0.8,
+    'buoyancy': 1.0,
+    'surface_tension': 0.1,
+    'is_fluid': True
+})
+_WIND_PHYSICS_CONSTANTS = MappingProxyType({
+    'turbulence': 0.2,
+    'gust_frequency': 0.1,
+    'gust_strength': 0.5
+})
+
+# Unit-radius icosphere tessellated once and scaled per collision sphere
+_UNIT_ICOSPHERE_2 = trimesh.creation.icosphere(radius=1.0, subdivisions=2)
+
 class PhysicsUtils:
     @staticmethod
     def create_physics_material(material_type='default'):
         """Create physics material properties for different terrain types."""
-        materials = {
-            'default': {
-                'friction': 0.6,
-                'bounciness': 0.0,
-                'density': 1.0
-            },
-            'grass': {
-                'friction': 0.8,
-                'bounciness': 0.1,
-                'density': 0.8
-            },
-            'rock': {
-                'friction': 0.4,
-                'bounciness': 0.2,
-                'density': 2.5
-            },
-            'sand': {
-                'friction': 0.9,
-                'bounciness': 0.0,
-                'density': 1.6
-            },
-            'water': {
-                'friction': 0.1,
-                'bounciness': 0.0,
-                'density': 1.0,
-                'is_fluid': True
-            },
-            'snow': {
-                'friction': 0.7,
-                'bounciness': 0.3,
-                'density': 0.3
-            }
-        }
-        
-        return materials.get(material_type, materials['default'])
+        return dict(_PHYSICS_MATERIALS.get(material_type, _PHYSICS_MATERIALS['default']))
 
     @staticmethod
     def create_collision_box(mesh, padding=0.1):
@@ -49,43 +84,27 @@ class PhysicsUtils:
         center = (bounds[0] + bounds[1]) / 2
         size = bounds[1] - bounds[0] + padding
         
-        # Create box vertices
+        # Create box vertices and faces from the unit box template
         half_size = size / 2
-        vertices = np.array([
-            [center[0] - half_size[0], center[1] - half_size[1], center[2] - half_size[2]],
-            [center[0] + half_size[0], center[1] - half_size[1], center[2] - half_size[2]],
-            [center[0] + half_size[0], center[1] + half_size[1], center[2] - half_size[2]],
-            [center[0] - half_size[0], center[1] + half_size[1], center[2] - half_size[2]],
-            [center[0] - half_size[0], center[1] - half_size[1], center[2] + half_size[2]],
-            [center[0] + half_size[0], center[1] - half_size[1], center[2] + half_size[2]],
-            [center[0] + half_size[0], center[1] + half_size[1], center[2] + half_size[2]],
-            [center[0] - half_size[0], center[1] + half_size[1], center[2] + half_size[2]]
-        ])
-        
-        # Create box faces
-        faces = np.array([
-            [0, 1, 2], [0, 2, 3],  # bottom
-            [4, 7, 6], [4, 6, 5],  # top
-            [0, 4, 5], [0, 5, 1],  # front
-            [2, 6, 7], [2, 7, 3],  # back
-            [0, 3, 7], [0, 7, 4],  # left
-            [1, 5, 6], [1, 6, 2]   # right
-        ])
-        
-        return trimesh.Trimesh(vertices=vertices, faces=faces)
+        vertices = center + half_size * _UNIT_BOX_VERTS
+        
+        # The template has no duplicate vertices or degenerate faces to clean up
+        return trimesh.Trimesh(vertices=vertices, faces=_BOX_FACES.copy(), process=False)
 
     @staticmethod
     def create_collision_sphere(mesh, padding=0.1):
         """Create a bounding sphere collision mesh."""
         bounds = mesh.bounds
         center = (bounds[0] + bounds[1]) / 2
-        radius = np.linalg.norm(bounds[1] - bounds[0]) / 2 + padding
-        
-        # Create sphere mesh
-        sphere = trimesh.creation.icosphere(radius=radius, subdivisions=2)
-        sphere.vertices += center
-        
-        return sphere
+        d = bounds[1] - bounds[0]
+        radius = 0.5 * math.sqrt(d[0] * d[0] + d[1] * d[1] + d[2] * d[2]) + padding
+        
+        # Create sphere mesh by scaling the cached unit icosphere
+        return trimesh.Trimesh(
+            vertices=_UNIT_ICOSPHERE_2.vertices * radius + center,
+            faces=_UNIT_ICOSPHERE_2.faces.copy(),
+            process=False
+        )
 
     @staticmethod
     def create_collision_capsule(mesh, padding=0.1):
@@ -109,32 +128,26 @@ class PhysicsUtils:
         if len(mesh.vertices) <= target_vertices:
             return mesh
         
-        # Simplify mesh using available methods
+        # Simplify mesh, falling back to the input's hull when decimation is unavailable,
+        # fails, or leaves the mesh open (trimesh caches the hull on the mesh, so Qhull
+        # runs at most once per input)
         try:
-            if hasattr(mesh, 'simplify_quadratic_decimation'):
-                simplified = mesh.simplify_quadratic_decimation(
-                    target_vertices=target_vertices
-                )
-            else:
-                # Fallback to convex hull for optimization
+            simplified = mesh.simplify_quadratic_decimation(target_vertices=target_vertices)
+            if not simplified.is_watertight:
                 simplified = mesh.convex_hull
-        except:
-            # If simplification fails, use convex hull
+        except Exception:
             simplified = mesh.convex_hull
         
-        # Ensure mesh is watertight
-        if not simplified.is_watertight:
-            # Create convex hull as fallback
-            simplified = simplified.convex_hull
-        
         return simplified
 
     @staticmethod
     def create_terrain_collision_layers(mesh, height_thresholds=None):
         """Create multiple collision layers for complex terrain."""
+        vertices = mesh.vertices
+        heights = vertices[:, 2]
+        
         if height_thresholds is None:
             # Default height thresholds
-            heights = mesh.vertices[:, 2]
             min_h, max_h = heights.min(), heights.max()
             height_thresholds = [
                 min_h + (max_h - min_h) * 0.2,  # Low terrain
@@ -143,7 +156,6 @@ class PhysicsUtils:
             ]
         
         layers = []
-        heights = mesh.vertices[:, 2]
         
         for i, threshold in enumerate(height_thresholds):
             # Create mask for this height layer
@@ -156,13 +168,14 @@ class PhysicsUtils:
             
             if np.any(mask):
                 # Extract vertices and faces for this layer
-                layer_vertices = mesh.vertices[mask]
-                layer_faces = []
+                layer_vertices = vertices[mask]
                 
-                # Find faces that belong to this layer
-                for face in mesh.faces:
-                    if all(mask[face]):
-                        layer_faces.append(face)
+                # Faces whose three vertices all belong to this layer, reindexed
+                # onto the sliced vertex array
+                faces = mesh.faces
+                keep = mask[faces].all(axis=1)
+                new_index = np.cumsum(mask) - 1
+                layer_faces = new_index[faces[keep]]
                 
                 if len(layer_faces) > 0:
                     layer_mesh = trimesh.Trimesh(
@@ -214,11 +227,7 @@ class PhysicsUtils:
         water_physics = {
             'water_level': water_level,
             'flow_direction': flow_direction,
-            'flow_speed': 1.0,
-            'viscosity': 0.8,
-            'buoyancy': 1.0,
-            'surface_tension': 0.1,
-            'is_fluid': True
+            **_WATER_PHYSICS_CONSTANTS
         }
         
         return water_physics
@@ -229,9 +238,7 @@ class PhysicsUtils:
         wind_physics = {
             'direction': wind_direction,
             'strength': wind_strength,
-            'turbulence': 0.2,
-            'gust_frequency': 0.1,
-            'gust_strength': 0.5
+            **_WIND_PHYSICS_CONSTANTS
         }
         
         return wind_physics 
\ No newline at end of file
@@ -1,10 +1,107 @@
 import numpy as np
-from noise import pnoise2, snoise2
 from scipy.ndimage import gaussian_filter, sobel
 from scipy.spatial.distance import cdist
-import matplotlib.pyplot as plt
 from PIL import Image
 
+# Colormaps resolved by save_heightmap_as_image, by name
+_COLORMAPS = {}
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Ken Perlin's permutation table and the gradient table used by the `noise` package's
+# pnoise2, so the vectorized noise below reproduces its output. The permutation is
+# repeated so the base-offset lookups never run off the end.
+_PERM = np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140,
+    36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120,
+    234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32, 57, 177, 33,
+    88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74, 165, 71,
+    134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133,
+    230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161,
+    1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169, 200, 196, 135, 130,
+    116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64, 52, 217, 226, 250,
+    124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227,
+    47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44,
+    154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19, 98,
+    108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97, 228, 251, 34,
+    242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235, 249, 14,
+    239, 107, 49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176, 115, 121,
+    50, 45, 127, 4, 150, 254, 138, 236, 205, 93, 222, 114, 67, 29, 24, 72, 243,
+    141, 128, 195, 78, 66, 215, 61, 156, 180
+] * 4, dtype=np.intp)
+_GRAD2 = np.array([
+    [1, 1], [-1, 1], [1, -1], [-1, -1], [1, 0], [-1, 0], [1, 0], [-1, 0],
+    [0, 1], [0, -1], [0, 1], [0, -1], [1, 0], [-1, 0], [0, -1], [0, 1]
+], dtype=np.float64)
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _erode_kernel(eroded, xs, ys, erosion_rate):
+        """One erosion iteration in place, one droplet per pre-sampled (xs[d], ys[d]) start point.
+        
+        Droplets run serially: each reads and writes cells its neighbours may touch.
+        """
+        inv_sqrt2 = 1.0 / np.sqrt(2.0)
+        
+        for d in range(xs.shape[0]):
+            x = xs[d]
+            y = ys[d]
+            h = eroded[y, x]
+            
+            # Steepest descent over the 8 neighbours, unrolled in the same
+            # column-major order as the reference loop (first maximum wins)
+            max_slope = 0.0
+            dx = 0
+            dy = 0
+            slope = (h - eroded[y - 1, x - 1]) * inv_sqrt2
+            if slope > max_slope:
+                max_slope, dx, dy = slope, -1, -1
+            slope = h - eroded[y, x - 1]
+            if slope > max_slope:
+                max_slope, dx, dy = slope, -1, 0
+            slope = (h - eroded[y + 1, x - 1]) * inv_sqrt2
+            if slope > max_slope:
+                max_slope, dx, dy = slope, -1, 1
+            slope = h - eroded[y - 1, x]
+            if slope > max_slope:
+                max_slope, dx, dy = slope, 0, -1
+            slope = h - eroded[y + 1, x]
+            if slope > max_slope:
+                max_slope, dx, dy = slope, 0, 1
+            slope = (h - eroded[y - 1, x + 1]) * inv_sqrt2
+            if slope > max_slope:
+                max_slope, dx, dy = slope, 1, -1
+            slope = h - eroded[y, x + 1]
+            if slope > max_slope:
+                max_slope, dx, dy = slope, 1, 0
+            slope = (h - eroded[y + 1, x + 1]) * inv_sqrt2
+            if slope > max_slope:
+                max_slope, dx, dy = slope, 1, 1
+            
+            # Interior start points keep every neighbour in bounds
+            if max_slope > 0:
+                eroded[y, x] -= erosion_rate * max_slope
+                eroded[y + dy, x + dx] += erosion_rate * max_slope * 0.5
+
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _slope_kernel(padded, out):
+        """Sobel gradient magnitude of an edge-padded heightmap in a single fused pass."""
+        height, width = out.shape
+        for i in prange(height):
+            for j in range(width):
+                # (i, j) in `out` is (i + 1, j + 1) in `padded`
+                gx = ((padded[i, j + 2] + 2 * padded[i + 1, j + 2] + padded[i + 2, j + 2])
+                      - (padded[i, j] + 2 * padded[i + 1, j] + padded[i + 2, j]))
+                gy = ((padded[i + 2, j] + 2 * padded[i + 2, j + 1] + padded[i + 2, j + 2])
+                      - (padded[i, j] + 2 * padded[i, j + 1] + padded[i, j + 2]))
+                out[i, j] = np.sqrt(gx * gx + gy * gy)
+else:
+    _erode_kernel = None
+    _slope_kernel = None
+
 class TerrainUtils:
     @staticmethod
     def _apply_transformations(vertices, scale_factor=10.0, rotate_x_90=True):
@@ -26,67 +123,152 @@ class TerrainUtils:
         
         return vertices
 
+    @staticmethod
+    def _perlin2(x, y, repeat, base):
+        """Single-octave improved Perlin noise over coordinate arrays (noise.pnoise2's noise2)."""
+        i = np.floor(np.fmod(x, repeat))
+        j = np.floor(np.fmod(y, repeat))
+        ii = (np.fmod(i + 1, repeat).astype(np.intp) & 255) + base
+        jj = (np.fmod(j + 1, repeat).astype(np.intp) & 255) + base
+        i = (i.astype(np.intp) & 255) + base
+        j = (j.astype(np.intp) & 255) + base
+        
+        # Offsets within the lattice cell and their quintic fade curves
+        x = x - np.floor(x)
+        y = y - np.floor(y)
+        fx = x * x * x * (x * (x * 6 - 15) + 10)
+        fy = y * y * y * (y * (y * 6 - 15) + 10)
+        
+        # Hash the four cell corners
+        A = _PERM[i]
+        B = _PERM[ii]
+        AA = _PERM[A + j]
+        AB = _PERM[A + jj]
+        BA = _PERM[B + j]
+        BB = _PERM[B + jj]
+        
+        def grad(hash_, gx, gy):
+            g = _GRAD2[_PERM[hash_] & 15]
+            return gx * g[..., 0] + gy * g[..., 1]
+        
+        # Blend the corner gradients along x, then along y
+        g00 = grad(AA, x, y)
+        g01 = grad(AB, x, y - 1)
+        bottom = g00 + fx * (grad(BA, x - 1, y) - g00)
+        top = g01 + fx * (grad(BB, x - 1, y - 1) - g01)
+        return bottom + fy * (top - bottom)
+
+    @staticmethod
+    def _pnoise2(x, y, octaves=1, persistence=0.5, lacunarity=2.0, repeat=1024.0, base=0):
+        """Vectorized drop-in for noise.pnoise2: fBm-summed Perlin noise over broadcastable arrays."""
+        total = 0.0
+        freq = 1.0
+        amp = 1.0
+        max_amp = 0.0
+        for _ in range(octaves):
+            total = total + TerrainUtils._perlin2(x * freq, y * freq, repeat * freq, base) * amp
+            max_amp += amp
+            freq *= lacunarity
+            amp *= persistence
+        return total / max_amp
+
     @staticmethod
     def generate_heightmap(width, height, scale=50, octaves=6, persistence=0.5, 
-                          lacunarity=2.0, base=0, terrain_type='mountain'):
+                          lacunarity=2.0, base=0, terrain_type='mountain', dtype=np.float32):
         """Generate a heightmap using multiple noise layers."""
-        heightmap = np.zeros((height, width))
+        return TerrainUtils.generate_heightmap_tile(
+            0, 0, width, height, width, height, scale=scale, octaves=octaves,
+            persistence=persistence, lacunarity=lacunarity, base=base,
+            terrain_type=terrain_type, dtype=dtype
+        )
+
+    @staticmethod
+    def generate_heightmap_tile(x0, y0, tile_width, tile_height, total_width, total_height,
+                                scale=50, octaves=6, persistence=0.5, lacunarity=2.0, base=0,
+                                terrain_type='mountain', dtype=np.float32):
+        """Generate one tile of a larger heightmap (sampled at global coordinates so tiles stitch seamlessly)."""
+        tile_width = min(tile_width, total_width - x0)
+        tile_height = min(tile_height, total_height - y0)
         
-        for i in range(height):
-            for j in range(width):
-                x = i / height * scale
-                y = j / width * scale
-                
-                if terrain_type == 'mountain':
-                    # Multi-layered mountain terrain
-                    heightmap[i, j] = (
-                        pnoise2(x, y, octaves=octaves, persistence=persistence, 
-                               lacunarity=lacunarity, base=base) * 0.5 +
-                        pnoise2(x*2, y*2, octaves=4, persistence=0.3, 
-                               lacunarity=2.5, base=base+1) * 0.3 +
-                        pnoise2(x*4, y*4, octaves=2, persistence=0.2, 
-                               lacunarity=3.0, base=base+2) * 0.2
-                    )
-                elif terrain_type == 'hills':
-                    # Gentle rolling hills
-                    heightmap[i, j] = pnoise2(x, y, octaves=4, persistence=0.4, 
-                                            lacunarity=2.0, base=base) * 0.3
-                elif terrain_type == 'valley':
-                    # Valley with river-like features
-                    base_noise = pnoise2(x, y, octaves=6, persistence=0.5, 
-                                       lacunarity=2.0, base=base)
-                    river_mask = np.exp(-((x - scale/2)**2 + (y - scale/2)**2) / (scale/4)**2)
-                    heightmap[i, j] = -base_noise * 0.4 - river_mask * 0.3
-                elif terrain_type == 'plateau':
-                    # Plateau with some variation
-                    base_height = pnoise2(x, y, octaves=2, persistence=0.3, 
-                                        lacunarity=2.0, base=base) * 0.2
-                    heightmap[i, j] = np.maximum(base_height, 0.1)
-                elif terrain_type == 'canyon':
-                    # Canyon terrain
-                    base_noise = pnoise2(x, y, octaves=4, persistence=0.4, 
-                                       lacunarity=2.0, base=base)
-                    canyon_mask = np.exp(-((x - scale/2)**2) / (scale/8)**2)
-                    heightmap[i, j] = base_noise * 0.3 - canyon_mask * 0.6
-                else:
-                    # Default terrain
-                    heightmap[i, j] = pnoise2(x, y, octaves=octaves, persistence=persistence, 
-                                            lacunarity=lacunarity, base=base) * 0.5
-        
-        return heightmap
+        # Noise coordinates of the tile's rows and columns; the noise layers broadcast
+        # them to full (tile_height, tile_width) arrays, one array pass per octave
+        x = (np.arange(y0, y0 + tile_height) / total_height * scale)[:, None]
+        y = (np.arange(x0, x0 + tile_width) / total_width * scale)[None, :]
+        pnoise2 = TerrainUtils._pnoise2
+        
+        # Each branch scales and combines the noise layers in place, so the only
+        # full-size arrays are the ones pnoise2 returns
+        if terrain_type == 'mountain':
+            # Multi-layered mountain terrain
+            heightmap = pnoise2(x, y, octaves=octaves, persistence=persistence, 
+                               lacunarity=lacunarity, base=base)
+            heightmap *= 0.5
+            detail = pnoise2(x*2, y*2, octaves=4, persistence=0.3, 
+                            lacunarity=2.5, base=base+1)
+            detail *= 0.3
+            heightmap += detail
+            detail = pnoise2(x*4, y*4, octaves=2, persistence=0.2, 
+                            lacunarity=3.0, base=base+2)
+            detail *= 0.2
+            heightmap += detail
+        elif terrain_type == 'hills':
+            # Gentle rolling hills
+            heightmap = pnoise2(x, y, octaves=4, persistence=0.4, 
+                               lacunarity=2.0, base=base)
+            heightmap *= 0.3
+        elif terrain_type == 'valley':
+            # Valley with river-like features; the gaussian river mask is separable,
+            # so it is the outer product of a row and a column factor
+            heightmap = pnoise2(x, y, octaves=6, persistence=0.5, 
+                               lacunarity=2.0, base=base)
+            heightmap *= -0.4
+            river_rows = np.exp(-(x - scale/2)**2 / (scale/4)**2)
+            river_rows *= 0.3
+            heightmap -= river_rows * np.exp(-(y - scale/2)**2 / (scale/4)**2)
+        elif terrain_type == 'plateau':
+            # Plateau with some variation
+            heightmap = pnoise2(x, y, octaves=2, persistence=0.3, 
+                               lacunarity=2.0, base=base)
+            heightmap *= 0.2
+            np.maximum(heightmap, 0.1, out=heightmap)
+        elif terrain_type == 'canyon':
+            # Canyon terrain; the mask varies along rows only and broadcasts
+            heightmap = pnoise2(x, y, octaves=4, persistence=0.4, 
+                               lacunarity=2.0, base=base)
+            heightmap *= 0.3
+            heightmap -= np.exp(-((x - scale/2)**2) / (scale/8)**2) * 0.6
+        else:
+            # Default terrain
+            heightmap = pnoise2(x, y, octaves=octaves, persistence=persistence, 
+                               lacunarity=lacunarity, base=base)
+            heightmap *= 0.5
+        
+        return heightmap.astype(dtype, copy=False)
 
     @staticmethod
-    def apply_erosion(heightmap, iterations=100, erosion_rate=0.01):
+    def apply_erosion(heightmap, iterations=100, erosion_rate=0.01, dtype=None):
         """Apply simple hydraulic erosion to the heightmap."""
-        eroded = heightmap.copy()
+        eroded = heightmap.astype(dtype or heightmap.dtype, copy=True)
         height, width = heightmap.shape
         
+        # Droplets start at interior cells only; without any there is nothing to erode
+        n_droplets = width * height // 10
+        if width < 3 or height < 3 or n_droplets == 0:
+            return eroded
+        
+        # Sample each iteration's start points in one call per axis instead of two calls
+        # per droplet, keeping the buffers to one iteration's worth
+        rng = np.random.default_rng()
         for _ in range(iterations):
+            xs = rng.integers(1, width - 1, size=n_droplets, dtype=np.int32)
+            ys = rng.integers(1, height - 1, size=n_droplets, dtype=np.int32)
+            
+            if _erode_kernel is not None:
+                _erode_kernel(eroded, xs, ys, erosion_rate)
+                continue
+            
             # Random starting points
-            for _ in range(width * height // 10):
-                x = np.random.randint(1, width - 1)
-                y = np.random.randint(1, height - 1)
-                
+            for x, y in zip(xs.tolist(), ys.tolist()):
                 # Find steepest descent
                 max_slope = 0
                 dx, dy = 0, 0
@@ -110,6 +292,13 @@ class TerrainUtils:
     @staticmethod
     def generate_slope_map(heightmap):
         """Generate a slope map from the heightmap."""
+        if _slope_kernel is not None:
+            # Symmetric padding reproduces sobel's default 'reflect' boundary handling
+            padded = np.pad(heightmap, 1, mode='symmetric')
+            slope = np.empty(heightmap.shape, dtype=np.result_type(heightmap.dtype, np.float32))
+            _slope_kernel(padded, slope)
+            return slope
+        
         # Calculate gradients
         grad_x = sobel(heightmap, axis=1)
         grad_y = sobel(heightmap, axis=0)
@@ -119,127 +308,161 @@ class TerrainUtils:
         
         return slope
 
+    @staticmethod
+    def _stamp_features(modified, xs, ys, radii, amounts):
+        """Add a quadratic-falloff disc of the given amount (negative to dig) at each feature."""
+        height, width = modified.shape
+        for x, y, radius, amount in zip(xs, ys, radii, amounts):
+            x0, x1 = max(0, int(x - radius)), min(width, int(x + radius))
+            y0, y1 = max(0, int(y - radius)), min(height, int(y + radius))
+            if x0 >= x1 or y0 >= y1:
+                continue
+            
+            # Distances from the feature centre over its bounding box in one broadcast
+            dy, dx = np.ogrid[y0 - y:y1 - y, x0 - x:x1 - x]
+            factor = np.maximum(1 - np.sqrt(dx * dx + dy * dy) / radius, 0)
+            modified[y0:y1, x0:x1] += amount * factor * factor
+
+    @staticmethod
+    def _stamp_features_fft(modified, xs, ys, radii, amounts):
+        """Dense-feature variant of _stamp_features: one FFT convolution per rounded radius."""
+        from scipy.signal import fftconvolve
+        
+        buckets = np.rint(radii).astype(np.int64)
+        impulses = np.empty(modified.shape)
+        for radius in np.unique(buckets):
+            # Impulse map of this bucket's feature amounts, spread by a symmetric falloff kernel
+            selected = buckets == radius
+            impulses.fill(0)
+            np.add.at(impulses, (ys[selected], xs[selected]), amounts[selected])
+            dy, dx = np.ogrid[-radius:radius + 1, -radius:radius + 1]
+            factor = np.maximum(1 - np.sqrt(dx * dx + dy * dy) / radius, 0)
+            modified += fftconvolve(impulses, factor * factor, mode='same')
+
+    @staticmethod
+    def _apply_features(modified, xs, ys, radii, amounts):
+        """Stamp features one by one, or via FFT once their total footprint outweighs an FFT pass."""
+        n_pixels = modified.size
+        if len(radii) and len(radii) * np.mean(radii * radii) > n_pixels * np.log(n_pixels):
+            TerrainUtils._stamp_features_fft(modified, xs, ys, radii, amounts)
+        else:
+            TerrainUtils._stamp_features(modified, xs, ys, radii, amounts)
+
     @staticmethod
     def add_features(heightmap, feature_type='rocks', density=0.1):
         """Add features like rocks, trees, or other objects to the heightmap."""
         height, width = heightmap.shape
         modified = heightmap.copy()
+        num_features = int(width * height * density)
         
         if feature_type == 'rocks':
             # Add rock formations (elevated areas)
-            num_features = int(width * height * density)
-            for _ in range(num_features):
-                x = np.random.randint(0, width)
-                y = np.random.randint(0, height)
-                radius = np.random.uniform(2, 5)
-                height_increase = np.random.uniform(0.5, 2.0)
-                
-                # Create rock formation
-                for nx in range(max(0, int(x-radius)), min(width, int(x+radius))):
-                    for ny in range(max(0, int(y-radius)), min(height, int(y+radius))):
-                        dist = np.sqrt((nx-x)**2 + (ny-y)**2)
-                        if dist < radius:
-                            factor = 1 - (dist / radius)
-                            modified[ny, nx] += height_increase * factor * factor
+            xs = np.random.randint(0, width, num_features)
+            ys = np.random.randint(0, height, num_features)
+            radii = np.random.uniform(2, 5, num_features)
+            height_increases = np.random.uniform(0.5, 2.0, num_features)
+            TerrainUtils._apply_features(modified, xs, ys, radii, height_increases)
         
         elif feature_type == 'craters':
             # Add craters (depressions)
-            num_features = int(width * height * density)
-            for _ in range(num_features):
-                x = np.random.randint(0, width)
-                y = np.random.randint(0, height)
-                radius = np.random.uniform(3, 8)
-                depth = np.random.uniform(0.5, 1.5)
-                
-                # Create crater
-                for nx in range(max(0, int(x-radius)), min(width, int(x+radius))):
-                    for ny in range(max(0, int(y-radius)), min(height, int(y+radius))):
-                        dist = np.sqrt((nx-x)**2 + (ny-y)**2)
-                        if dist < radius:
-                            factor = 1 - (dist / radius)
-                            modified[ny, nx] -= depth * factor * factor
+            xs = np.random.randint(0, width, num_features)
+            ys = np.random.randint(0, height, num_features)
+            radii = np.random.uniform(3, 8, num_features)
+            depths = np.random.uniform(0.5, 1.5, num_features)
+            TerrainUtils._apply_features(modified, xs, ys, radii, -depths)
         
         return modified
 
     @staticmethod
     def generate_texture(heightmap, texture_type='grass'):
         """Generate a texture map based on height and slope."""
-        height, width = heightmap.shape
-        
         # Normalize heightmap
         normalized_height = (heightmap - heightmap.min()) / (heightmap.max() - heightmap.min())
         
-        # Generate slope map
-        slope = TerrainUtils.generate_slope_map(heightmap)
-        normalized_slope = slope / slope.max()
-        
-        # Create texture based on type
+        # Create texture based on type; each is assembled in one (H, W, 3) write
         if texture_type == 'grass':
+            # Generate slope map (only the grass texture depends on slope)
+            slope = TerrainUtils.generate_slope_map(heightmap)
+            normalized_slope = slope / slope.max()
+            
             # Green texture varying with height and slope
-            texture = np.zeros((height, width, 3))
-            texture[:, :, 0] = 0.1 + 0.3 * normalized_height  # Red
-            texture[:, :, 1] = 0.3 + 0.5 * (1 - normalized_slope)  # Green
-            texture[:, :, 2] = 0.1 + 0.2 * normalized_height  # Blue
+            texture = np.stack([
+                0.1 + 0.3 * normalized_height,  # Red
+                0.3 + 0.5 * (1 - normalized_slope),  # Green
+                0.1 + 0.2 * normalized_height  # Blue
+            ], axis=-1)
         
         elif texture_type == 'rock':
             # Gray texture for rocky areas
-            texture = np.zeros((height, width, 3))
             gray_value = 0.3 + 0.4 * normalized_height
-            texture[:, :, 0] = gray_value
-            texture[:, :, 1] = gray_value
-            texture[:, :, 2] = gray_value
+            texture = np.repeat(gray_value[:, :, None], 3, axis=-1)
         
         elif texture_type == 'snow':
             # White texture for snow-capped peaks
-            texture = np.zeros((height, width, 3))
             snow_mask = normalized_height > 0.7
-            texture[snow_mask] = [0.9, 0.9, 0.9]
-            texture[~snow_mask] = [0.3, 0.3, 0.3]
+            texture = np.where(snow_mask[:, :, None], np.array([0.9, 0.9, 0.9]), np.array([0.3, 0.3, 0.3]))
+        
+        # 8-bit color is the export format, and a quarter of float32's bandwidth downstream
+        return (np.clip(texture, 0, 1) * 255).astype(np.uint8)
+
+    @staticmethod
+    def save_heightmap_as_image(heightmap, filename, colormap='terrain', annotated=False):
+        """Save heightmap as an image file (annotated=True adds the titled matplotlib figure with a colorbar)."""
+        if annotated:
+            import matplotlib.pyplot as plt
+            plt.figure(figsize=(10, 8))
+            plt.imshow(heightmap, cmap=colormap)
+            plt.colorbar(label='Height')
+            plt.title('Terrain Heightmap')
+            plt.axis('off')
+            plt.savefig(filename, dpi=150, bbox_inches='tight')
+            plt.close()
+            return
+        
+        # Colormap lookup straight to RGBA bytes; no figure, colorbar or tight-bbox re-render
+        cmap = _COLORMAPS.get(colormap)
+        if cmap is None:
+            from matplotlib import colormaps
+            cmap = _COLORMAPS[colormap] = colormaps[colormap]
         
-        return texture
+        h_min = np.nanmin(heightmap)
+        h_max = np.nanmax(heightmap)
+        normalized = (heightmap - h_min) / (h_max - h_min + 1e-9)
+        Image.fromarray(cmap(normalized, bytes=True)).save(filename, optimize=False, compress_level=1)
 
     @staticmethod
-    def save_heightmap_as_image(heightmap, filename, colormap='terrain'):
-        """Save heightmap as an image file."""
-        plt.figure(figsize=(10, 8))
-        plt.imshow(heightmap, cmap=colormap)
-        plt.colorbar(label='Height')
-        plt.title('Terrain Heightmap')
-        plt.axis('off')
-        plt.savefig(filename, dpi=150, bbox_inches='tight')
-        plt.close()
+    def save_heightmap_as_png16(heightmap, filename):
+        """Save heightmap as a 16-bit grayscale PNG (full range mapped to 0-65535)."""
+        h_min = np.nanmin(heightmap)
+        h_max = np.nanmax(heightmap)
+        normalized = (heightmap - h_min) / (h_max - h_min + 1e-9)
+        Image.fromarray((normalized * 65535).astype(np.uint16)).save(filename, compress_level=1)
 
     @staticmethod
     def create_terrain_mesh_from_heightmap(heightmap, width=50, height=50, scale=1.0):
         """Create a mesh from a heightmap."""
         h, w = heightmap.shape
         
-        # Create coordinate grids
-        x_coords = np.linspace(-width/2, width/2, w)
-        y_coords = np.linspace(-height/2, height/2, h)
-        X, Y = np.meshgrid(x_coords, y_coords)
-        
-        # Scale heightmap
-        Z = heightmap * scale
-        
-        # Create vertices
-        vertices = np.column_stack([X.flatten(), Y.flatten(), Z.flatten()])
-        
-        # Apply transformations (rotation and scaling)
-        vertices = TerrainUtils._apply_transformations(vertices)
-        
-        # Create faces (triangles)
-        faces = []
-        for i in range(h - 1):
-            for j in range(w - 1):
-                # Calculate vertex indices
-                v0 = i * w + j
-                v1 = i * w + (j + 1)
-                v2 = (i + 1) * w + j
-                v3 = (i + 1) * w + (j + 1)
-                
-                # Create two triangles
-                faces.append([v0, v1, v2])
-                faces.append([v1, v3, v2])
+        # Create vertices already rotated 90 degrees around X and scaled, as
+        # _apply_transformations would: (x, y, z) -> (x, -z, y) * scale_factor
+        scale_factor = 10.0
+        vertices = np.empty((h, w, 3))
+        vertices[..., 0] = np.linspace(-width/2, width/2, w) * scale_factor
+        np.multiply(heightmap, -scale * scale_factor, out=vertices[..., 1])
+        vertices[..., 2] = (np.linspace(-height/2, height/2, h) * scale_factor)[:, None]
+        vertices = vertices.reshape(-1, 3)
+        
+        # Create faces (triangles): two per grid quad, built for all quads at once
+        ii, jj = np.mgrid[0:h - 1, 0:w - 1]
+        v0 = (ii * w + jj).ravel().astype(np.int32)
+        v1 = v0 + 1
+        v2 = v0 + w
+        v3 = v2 + 1
+        
+        # Interleave each quad's two triangles, matching the row-major quad order
+        faces = np.stack([
+            np.stack([v0, v1, v2], axis=1),
+            np.stack([v1, v3, v2], axis=1)
+        ], axis=1).reshape(-1, 3)
         
         return vertices, faces 
\ No newline at end of file
@@ -2,160 +2,217 @@ import numpy as np
 import trimesh
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _transform_kernel(vertices, out, center, scale):
+        """out = (vertices - center) * scale, one fused pass with vertices split across threads."""
+        for i in prange(vertices.shape[0]):
+            out[i, 0] = (vertices[i, 0] - center[0]) * scale[0]
+            out[i, 1] = (vertices[i, 1] - center[1]) * scale[1]
+            out[i, 2] = (vertices[i, 2] - center[2]) * scale[2]
+else:
+    _transform_kernel = None
+
+# Export color dtype; numpy dtypes for builtin scalars are singletons, so the common
+# case is settled by an identity check before any dtype comparison
+_UINT8 = np.dtype(np.uint8)
+
+# Unity materials by type, built once. Only the outer mapping is read-only, so the
+# create_* functions hand out copies of the entries
+_MATERIALS = MappingProxyType({
+    'default': {
+        'name': 'DefaultMaterial',
+        'shader': 'Standard',
+        'color': [0.5, 0.5, 0.5, 1.0],
+        'metallic': 0.0,
+        'smoothness': 0.5
+    },
+    'terrain': {
+        'name': 'TerrainMaterial',
+        'shader': 'Standard',
+        'color': [0.3, 0.6, 0.3, 1.0],
+        'metallic': 0.0,
+        'smoothness': 0.3
+    },
+    'rock': {
+        'name': 'RockMaterial',
+        'shader': 'Standard',
+        'color': [0.5, 0.5, 0.5, 1.0],
+        'metallic': 0.1,
+        'smoothness': 0.2
+    },
+    'snow': {
+        'name': 'SnowMaterial',
+        'shader': 'Standard',
+        'color': [0.9, 0.9, 0.9, 1.0],
+        'metallic': 0.0,
+        'smoothness': 0.8
+    },
+    'water': {
+        'name': 'WaterMaterial',
+        'shader': 'Standard',
+        'color': [0.0, 0.3, 0.8, 0.8],
+        'metallic': 0.0,
+        'smoothness': 1.0
+    },
+    'sand': {
+        'name': 'SandMaterial',
+        'shader': 'Standard',
+        'color': [0.8, 0.7, 0.5, 1.0],
+        'metallic': 0.0,
+        'smoothness': 0.1
+    },
+    'forest': {
+        'name': 'ForestMaterial',
+        'shader': 'Standard',
+        'color': [0.2, 0.5, 0.2, 1.0],
+        'metallic': 0.0,
+        'smoothness': 0.4
+    }
+})
+
+# Unity physics materials by type, built once
+_PHYSICS_MATERIALS = MappingProxyType({
+    'default': {
+        'name': 'DefaultPhysicsMaterial',
+        'friction': 0.6,
+        'bounciness': 0.0,
+        'frictionCombine': 'Average',
+        'bounceCombine': 'Average'
+    },
+    'grass': {
+        'name': 'GrassPhysicsMaterial',
+        'friction': 0.8,
+        'bounciness': 0.1,
+        'frictionCombine': 'Average',
+        'bounceCombine': 'Average'
+    },
+    'rock': {
+        'name': 'RockPhysicsMaterial',
+        'friction': 0.4,
+        'bounciness': 0.2,
+        'frictionCombine': 'Average',
+        'bounceCombine': 'Average'
+    },
+    'sand': {
+        'name': 'SandPhysicsMaterial',
+        'friction': 0.9,
+        'bounciness': 0.0,
+        'frictionCombine': 'Average',
+        'bounceCombine': 'Average'
+    },
+    'water': {
+        'name': 'WaterPhysicsMaterial',
+        'friction': 0.1,
+        'bounciness': 0.0,
+        'frictionCombine': 'Average',
+        'bounceCombine': 'Average'
+    },
+    'snow': {
+        'name': 'SnowPhysicsMaterial',
+        'friction': 0.7,
+        'bounciness': 0.3,
+        'frictionCombine': 'Average',
+        'bounceCombine': 'Average'
+    }
+})
+
+def _write_json(data, filename):
+    """Write data as indented JSON; numpy arrays and scalars are serialized natively."""
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=2, default=lambda obj: obj.tolist())
 
 def prepare_for_unity(mesh):
-    """Prepare the mesh for Unity import by ensuring correct orientation and scale."""
+    """Prepare the mesh for Unity import by ensuring correct orientation and scale.
+    
+    The mesh is centered on its axis-aligned bounding box, not its center of mass.
+    """
     # Make a copy of the mesh to avoid modifying the original
     unity_mesh = mesh.copy()
     
-    # Unity uses a left-handed coordinate system, while most 3D software uses right-handed
-    # Flip the Z-axis to convert from right-handed to left-handed
-    unity_mesh.vertices[:, 2] *= -1
+    # One min/max reduction over the source vertices gives both the bounding-box
+    # center and the extents; neither the flip nor the centering changes the extents
+    lo = mesh.vertices.min(axis=0)
+    hi = mesh.vertices.max(axis=0)
+    center = (lo + hi) * 0.5
     
-    # Ensure the mesh has proper face normals
-    unity_mesh.fix_normals()
+    # Scale the mesh to be more visible (if it's too small); the factor is folded into
+    # the single transform pass below, and a zero-size mesh is left unscaled
+    max_dim = (hi - lo).max()
+    scale_factor = 1.0 / max_dim if 0.0 < max_dim < 0.1 else 1.0
     
-    # Ensure the mesh is centered
-    unity_mesh.vertices -= unity_mesh.center_mass
+    # Unity uses a left-handed coordinate system, while most 3D software uses right-handed.
+    # Flip the Z-axis, center and scale in one expression: (v - c) * (s, s, -s)
+    scale = np.array([scale_factor, scale_factor, -scale_factor])
+    if _transform_kernel is not None:
+        vertices = np.empty(mesh.vertices.shape)
+        _transform_kernel(np.ascontiguousarray(mesh.vertices, dtype=np.float64), vertices, center, scale)
+    else:
+        vertices = np.subtract(mesh.vertices, center)
+        vertices *= scale
+    unity_mesh.vertices = vertices
     
-    # Scale the mesh to be more visible (if it's too small)
-    bounds = unity_mesh.bounds
-    max_dim = np.max(np.abs(bounds[1] - bounds[0]))
-    if max_dim < 0.1:  # If the mesh is very small
-        scale_factor = 1.0 / max_dim
-        unity_mesh.vertices *= scale_factor
+    # Ensure the mesh has proper face normals (winding only depends on the mirror, not the shift or scale)
+    unity_mesh.fix_normals()
     
     return unity_mesh
 
-def save_for_unity(mesh, filename):
-    """Save mesh optimized for Unity with proper coordinate system and colors."""
-    # Ensure mesh has proper normals
-    if not hasattr(mesh, 'face_normals') or mesh.face_normals is None:
-        mesh.face_normals = mesh.face_normals
+def save_for_unity(mesh, filename, is_collision=False):
+    """Save mesh optimized for Unity with proper coordinate system and colors.
     
-    # Ensure mesh has proper vertex normals
-    if not hasattr(mesh, 'vertex_normals') or mesh.vertex_normals is None:
-        mesh.vertex_normals = mesh.vertex_normals
+    Collision meshes (is_collision=True) are written as bare geometry: no normals,
+    colors or texture, which the physics engine never reads.
+    """
+    if is_collision:
+        mesh.export(filename, include_normals=False, include_color=False, include_texture=False)
+        return
     
-    # Ensure vertex colors are in the correct format
-    if hasattr(mesh, 'visual') and hasattr(mesh.visual, 'vertex_colors'):
-        # Ensure colors are RGBA uint8 format
-        colors = mesh.visual.vertex_colors
-        if colors.dtype != np.uint8:
-            colors = (colors * 255).astype(np.uint8)
-        mesh.visual.vertex_colors = colors
+    # Ensure vertex colors are in the correct format; only meshes that carry vertex
+    # colors are touched, so no default colors get synthesized for the others
+    visual = getattr(mesh, 'visual', None)
+    if getattr(visual, 'kind', None) == 'vertex':
+        # Ensure colors are RGBA uint8 format, scaling and casting in one pass
+        colors = visual.vertex_colors
+        if colors.dtype is not _UINT8 and colors.dtype != _UINT8:
+            converted = np.empty(colors.shape, dtype=_UINT8)
+            np.multiply(colors, 255, out=converted, casting='unsafe')
+            visual.vertex_colors = converted
     
-    # Export with proper settings for Unity
+    # Export with proper settings for Unity; the exporter computes the (cached) normals itself
     mesh.export(filename, include_normals=True, include_texture=True)
 
 def create_unity_material(material_type='default'):
     """Create Unity material properties."""
-    materials = {
-        'default': {
-            'name': 'DefaultMaterial',
-            'shader': 'Standard',
-            'color': [0.5, 0.5, 0.5, 1.0],
-            'metallic': 0.0,
-            'smoothness': 0.5
-        },
-        'terrain': {
-            'name': 'TerrainMaterial',
-            'shader': 'Standard',
-            'color': [0.3, 0.6, 0.3, 1.0],
-            'metallic': 0.0,
-            'smoothness': 0.3
-        },
-        'rock': {
-            'name': 'RockMaterial',
-            'shader': 'Standard',
-            'color': [0.5, 0.5, 0.5, 1.0],
-            'metallic': 0.1,
-            'smoothness': 0.2
-        },
-        'snow': {
-            'name': 'SnowMaterial',
-            'shader': 'Standard',
-            'color': [0.9, 0.9, 0.9, 1.0],
-            'metallic': 0.0,
-            'smoothness': 0.8
-        },
-        'water': {
-            'name': 'WaterMaterial',
-            'shader': 'Standard',
-            'color': [0.0, 0.3, 0.8, 0.8],
-            'metallic': 0.0,
-            'smoothness': 1.0
-        },
-        'sand': {
-            'name': 'SandMaterial',
-            'shader': 'Standard',
-            'color': [0.8, 0.7, 0.5, 1.0],
-            'metallic': 0.0,
-            'smoothness': 0.1
-        },
-        'forest': {
-            'name': 'ForestMaterial',
-            'shader': 'Standard',
-            'color': [0.2, 0.5, 0.2, 1.0],
-            'metallic': 0.0,
-            'smoothness': 0.4
-        }
-    }
-    
-    return materials.get(material_type, materials['default'])
+    material = _MATERIALS.get(material_type, _MATERIALS['default'])
+    return {**material, 'color': list(material['color'])}
 
 def create_unity_physics_material(material_type='default'):
     """Create Unity physics material properties."""
-    physics_materials = {
-        'default': {
-            'name': 'DefaultPhysicsMaterial',
-            'friction': 0.6,
-            'bounciness': 0.0,
-            'frictionCombine': 'Average',
-            'bounceCombine': 'Average'
-        },
-        'grass': {
-            'name': 'GrassPhysicsMaterial',
-            'friction': 0.8,
-            'bounciness': 0.1,
-            'frictionCombine': 'Average',
-            'bounceCombine': 'Average'
-        },
-        'rock': {
-            'name': 'RockPhysicsMaterial',
-            'friction': 0.4,
-            'bounciness': 0.2,
-            'frictionCombine': 'Average',
-            'bounceCombine': 'Average'
-        },
-        'sand': {
-            'name': 'SandPhysicsMaterial',
-            'friction': 0.9,
-            'bounciness': 0.0,
-            'frictionCombine': 'Average',
-            'bounceCombine': 'Average'
-        },
-        'water': {
-            'name': 'WaterPhysicsMaterial',
-            'friction': 0.1,
-            'bounciness': 0.0,
-            'frictionCombine': 'Average',
-            'bounceCombine': 'Average'
-        },
-        'snow': {
-            'name': 'SnowPhysicsMaterial',
-            'friction': 0.7,
-            'bounciness': 0.3,
-            'frictionCombine': 'Average',
-            'bounceCombine': 'Average'
-        }
-    }
-    
-    return physics_materials.get(material_type, physics_materials['default'])
+    return dict(_PHYSICS_MATERIALS.get(material_type, _PHYSICS_MATERIALS['default']))
 
 def export_unity_prefab(mesh, collision_mesh, filename, material_type='default', physics_type='default'):
     """Export complete Unity-ready prefab with materials and physics."""
-    base_name = os.path.splitext(os.path.basename(filename))[0]
+    # Split the name once; the collision mesh and prefab share its stem
+    stem, ext = os.path.splitext(filename)
+    base_name = os.path.basename(stem)
     
     # Create Unity material
     material = create_unity_material(material_type)
@@ -165,14 +222,14 @@ def export_unity_prefab(mesh, collision_mesh, filename, material_type='default',
     save_for_unity(mesh, filename)
     
     # Save collision mesh (always use the same base as filename)
-    collision_filename = filename.replace('.obj', '_collision.obj')
-    save_for_unity(collision_mesh, collision_filename)
+    collision_filename = f"{stem}_collision{ext}"
+    save_for_unity(collision_mesh, collision_filename, is_collision=True)
     
     # Create Unity prefab metadata
     prefab_data = {
         'name': base_name,
-        'visual_mesh': os.path.basename(filename),
-        'collision_mesh': os.path.basename(collision_filename),
+        'visual_mesh': base_name + ext,
+        'collision_mesh': f"{base_name}_collision{ext}",
         'material': material,
         'physics_material': physics_material,
         'transform': {
@@ -200,16 +257,17 @@ def export_unity_prefab(mesh, collision_mesh, filename, material_type='default',
     }
     
     # Save prefab metadata (always use the same base as filename)
-    prefab_filename = filename.replace('.obj', '_prefab.json')
-    with open(prefab_filename, 'w') as f:
-        json.dump(prefab_data, f, indent=2)
+    prefab_filename = f"{stem}_prefab.json"
+    _write_json(prefab_data, prefab_filename)
     
     return prefab_data
 
 def create_unity_terrain_layers(mesh, height_thresholds=None):
     """Create Unity terrain layers based on height."""
+    # Read the heights once for both the default thresholds and the bucketing
+    heights = np.ascontiguousarray(mesh.vertices[:, 2])
+    
     if height_thresholds is None:
-        heights = mesh.vertices[:, 2]
         min_h, max_h = heights.min(), heights.max()
         height_thresholds = [
             min_h + (max_h - min_h) * 0.2,  # Grass
@@ -218,19 +276,19 @@ def create_unity_terrain_layers(mesh, height_thresholds=None):
         ]
     
     layers = []
-    heights = mesh.vertices[:, 2]
     
     layer_types = ['grass', 'rock', 'snow']
     
+    # Bucket every height in one pass: bucket i holds thresholds[i-1] < h <= thresholds[i];
+    # the last layer is open-ended, so it also takes the heights above its threshold
+    n_layers = len(height_thresholds)
+    buckets = np.digitize(heights, height_thresholds, right=True)
+    counts = np.bincount(buckets, minlength=n_layers + 1)
+    if n_layers > 1:
+        counts[n_layers - 1] += counts[n_layers]
+    
     for i, threshold in enumerate(height_thresholds):
-        if i == 0:
-            mask = heights <= threshold
-        elif i == len(height_thresholds) - 1:
-            mask = heights > height_thresholds[i-1]
-        else:
-            mask = (heights > height_thresholds[i-1]) & (heights <= threshold)
-        
-        if np.any(mask):
+        if counts[i] > 0:
             layer_material = create_unity_material(layer_types[i])
             layer_physics = create_unity_physics_material(layer_types[i])
             
@@ -253,41 +311,55 @@ def export_unity_scene(meshes_data, scene_name="GeneratedScene"):
         'physics_materials': {}
     }
     
-    for i, (mesh, collision_mesh, mesh_type, material_type) in enumerate(meshes_data):
-        obj_name = f"{mesh_type}_{i}"
-        
-        # Save individual mesh files
-        mesh_filename = f"output/{obj_name}.obj"
-        collision_filename = f"output/{obj_name}_collision.obj"
-        
-        save_for_unity(mesh, mesh_filename)
-        save_for_unity(collision_mesh, collision_filename)
-        
-        # Create materials
-        material = create_unity_material(material_type)
-        physics_material = create_unity_physics_material(material_type)
+    # Create the output directory once up front rather than relying on each export
+    out_dir = Path('output')
+    os.makedirs(out_dir, exist_ok=True)
+    
+    # Mesh files are exported on a few worker threads (OBJ export is mostly GIL-bound
+    # Python) while the scene entries are built here; leaving the block waits for them all
+    material_names = {}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = []
         
-        # Add to scene
-        scene_data['objects'].append({
-            'name': obj_name,
-            'mesh_file': mesh_filename,
-            'collision_file': collision_filename,
-            'material': material['name'],
-            'physics_material': physics_material['name'],
-            'transform': {
-                'position': [0, 0, 0],
-                'rotation': [0, 0, 0],
-                'scale': [1, 1, 1]
-            }
-        })
+        for i, (mesh, collision_mesh, mesh_type, material_type) in enumerate(meshes_data):
+            obj_name = f"{mesh_type}_{i}"
+            
+            # Save individual mesh files
+            mesh_filename = str(out_dir / f"{obj_name}.obj")
+            collision_filename = str(out_dir / f"{obj_name}_collision.obj")
+            
+            futures.append(executor.submit(save_for_unity, mesh, mesh_filename))
+            futures.append(executor.submit(save_for_unity, collision_mesh, collision_filename, is_collision=True))
+            
+            # Create materials, once per material type; objects only reference them by name
+            names = material_names.get(material_type)
+            if names is None:
+                material = create_unity_material(material_type)
+                physics_material = create_unity_physics_material(material_type)
+                scene_data['materials'][material['name']] = material
+                scene_data['physics_materials'][physics_material['name']] = physics_material
+                names = material_names[material_type] = (material['name'], physics_material['name'])
+            
+            # Add to scene
+            scene_data['objects'].append({
+                'name': obj_name,
+                'mesh_file': mesh_filename,
+                'collision_file': collision_filename,
+                'material': names[0],
+                'physics_material': names[1],
+                'transform': {
+                    'position': [0, 0, 0],
+                    'rotation': [0, 0, 0],
+                    'scale': [1, 1, 1]
+                }
+            })
         
-        # Add materials to scene
-        scene_data['materials'][material['name']] = material
-        scene_data['physics_materials'][physics_material['name']] = physics_material
+        # Re-raise the first export failure
+        for future in futures:
+            future.result()
     
     # Save scene data
-    scene_filename = f"output/{scene_name}.json"
-    with open(scene_filename, 'w') as f:
-        json.dump(scene_data, f, indent=2)
+    scene_filename = out_dir / f"{scene_name}.json"
+    _write_json(scene_data, scene_filename)
     
     return scene_data 
\ No newline at end of file